@@ -0,0 +1,316 @@
+import argparse
+import contextlib
+import json
+import multiprocessing
+import platform
+import subprocess
+import time
+import yaml
+import matplotlib
+
+matplotlib.use("Agg")  # headless, the solvers' figures are never shown
+
+import numpy
+import networkx as nx
+import pennylane as qml
+from utils.dict_utils import dotdict
+from utils.graph_utils import get_square_graph, get_random_graph, approximation_ratio
+from utils.log_utils import peak_memory_mb
+from task_4.qaoa import PennylaneMIS_QAOA
+from task_4.adiabatic import AdiabaticMIS
+
+FAMILIES = ["square", "random", "star"]
+
+
+def benchmark_graph(family, num_nodes, edge_prob=0.4, seed=42):
+    """
+    Generate a benchmark graph.
+
+    Args:
+        family (str): One of ["square", "random", "star"], for `get_square_graph`, `get_random_graph` or a star
+            with `num_nodes - 1` leaves.
+        num_nodes (int): The number of nodes.
+        edge_prob (float, optional): Edge probability of the random graphs. Defaults to 0.4.
+        seed (int, optional): Seed of the random graphs. Defaults to 42.
+
+    Returns:
+        nx.Graph: The graph, with nodes labeled `0..num_nodes - 1`.
+    """
+    if family == "square":
+        return get_square_graph(num_nodes)[0]
+    if family == "random":
+        return get_random_graph(num_nodes, p_edge=edge_prob, draw_graph=False, seed=seed)
+    if family == "star":
+        return nx.star_graph(num_nodes - 1)
+    raise ValueError(f"Unknown graph family: {family} given, expected one of {FAMILIES}.")
+
+
+def benchmark_cases(bench_vars):
+    """
+    List the benchmark cases, every solver on every family, size and (for QAOA) depth.
+
+    The adiabatic solver embeds its own square register, so it only runs on the "square" family.
+
+    Args:
+        bench_vars (dotdict): The BENCHMARK_VARS of the configuration.
+
+    Returns:
+        list: A list of `{"solver", "family", "num_nodes", "depth"}` dicts, with depth None for the adiabatic solver.
+    """
+    solvers = ["qaoa", "adiabatic"] if bench_vars.SOLVERS.lower() == "both" else [bench_vars.SOLVERS.lower()]
+    cases = []
+    for family in bench_vars.FAMILIES:
+        for num_nodes in bench_vars.NUM_NODES:
+            if "qaoa" in solvers:
+                cases += [
+                    {"solver": "qaoa", "family": family, "num_nodes": num_nodes, "depth": depth}
+                    for depth in bench_vars.DEPTHS
+                ]
+            if "adiabatic" in solvers and family == "square":
+                cases.append({"solver": "adiabatic", "family": family, "num_nodes": num_nodes, "depth": None})
+    return cases
+
+
+def _count_calls(function, counter):
+    """Wrap `function`, counting one call per parameter set of a (possibly batched) call in `counter["calls"]`."""
+
+    def counted(params, *args, **kwargs):
+        counter["calls"] += int(numpy.prod(numpy.shape(params)[:-2]))
+        return function(params, *args, **kwargs)
+
+    return counted
+
+
+def _benchmark_qaoa(case, config):
+    """Time the QAOA optimization and probabilities of a case, see `run_case`."""
+    bench_vars, qaoa_vars = dotdict(config.BENCHMARK_VARS), dotdict(config.QAOA_VARS)
+    graph = benchmark_graph(case["family"], case["num_nodes"], bench_vars.EDGE_PROB, bench_vars.SEED)
+    solver = PennylaneMIS_QAOA(
+        graph=graph,
+        device=qaoa_vars.SIMULATOR,
+        precision=qaoa_vars.PRECISION or "double",
+        constrained=qaoa_vars.CONSTRAINED if qaoa_vars.CONSTRAINED is not None else True,
+    )
+
+    # circuit executions, as counted by the PennyLane device, statevector simulations of "numpy-diag", or closed
+    # form evaluations of "lightcone", which has no statevector
+    counter = {"calls": 0}
+    if qaoa_vars.SIMULATOR == "lightcone":
+        solver.engine.value_and_gradient = _count_calls(solver.engine.value_and_gradient, counter)
+        tracker = None
+    elif solver.engine is not None:
+        solver.engine.state = _count_calls(solver.engine.state, counter)
+        tracker = None
+    else:
+        tracker = qml.Tracker(solver.dev)
+
+    start = time.perf_counter()
+    with tracker or contextlib.nullcontext():
+        solver.solve(
+            qaoa_layer_depth=case["depth"],
+            steps=bench_vars.STEPS,
+            diff_method=qaoa_vars.DIFF_METHOD or "best",
+            optimizer=qaoa_vars.OPTIMIZER or "gd",
+            stepsize=qaoa_vars.STEPSIZE or 0.01,
+        )
+    solve_time = time.perf_counter() - start
+    evaluations = tracker.totals.get("executions", 0) if tracker is not None else counter["calls"]
+
+    start = time.perf_counter()
+    if qaoa_vars.SIMULATOR == "lightcone":
+        # the marginals of the nodes instead of the probabilities of the states, decoded together
+        solver.decode_marginals()
+        probs_time = time.perf_counter() - start
+    else:
+        probs = solver.get_probs(False)
+        probs_time = time.perf_counter() - start
+        solver.decode_probs(probs, qaoa_vars.DECODE_TOP_K or 16)
+
+    return {
+        "device": qaoa_vars.SIMULATOR,
+        "steps": solver.num_steps,
+        "solve_time": solve_time,
+        "time_per_step": solve_time / max(solver.num_steps, 1),
+        "probs_time": probs_time,
+        "circuit_evaluations": evaluations,
+        "cost": float(solver.cost_function(solver.params)),
+        "bitstring": solver.mis_nodes,
+    }
+
+
+def _benchmark_adiabatic(case, config):
+    """Time the adiabatic emulation of a case, see `run_case`."""
+    ada_vars = dotdict(config.ADIABATIC_VARS)
+    solver = AdiabaticMIS(case["num_nodes"], ada_vars.DISTANCE_MULTIPLIER)
+    time_step = 10
+
+    start = time.perf_counter()
+    counts = solver.solve(
+        rabi_f=ada_vars.RABI_FREQUENCY,
+        delta_0=ada_vars.DELTA_0,
+        delta_f=ada_vars.DELTA_F,
+        T=ada_vars.TOTAL_TIME,
+        backend=ada_vars.BACKEND,
+        time_step=time_step,
+        draw_plots=False,
+    )
+    solve_time = time.perf_counter() - start
+    solver.decode_counts(counts)
+
+    # the "blockade" backend evolves piecewise constant steps of `time_step`, QuTiP chooses its own steps
+    steps = ada_vars.TOTAL_TIME // time_step if ada_vars.BACKEND == "blockade" else None
+    return {
+        "device": ada_vars.BACKEND,
+        "steps": steps,
+        "solve_time": solve_time,
+        "time_per_step": solve_time / steps if steps else None,
+        "probs_time": None,
+        "circuit_evaluations": 1,
+        "cost": None,
+        "bitstring": solver.mis_nodes,
+    }
+
+
+def run_case(args):
+    """
+    Run a single benchmark case.
+
+    Args:
+        args (tuple): `(case, config)`, a case of `benchmark_cases` and the configuration.
+
+    Returns:
+        dict: The case, its timings, number of circuit evaluations, approximation ratio against the exact MIS and
+            the peak memory of the process, which is the case's own when it runs in a fresh process.
+    """
+    case, config = args
+    bench_vars = dotdict(config.BENCHMARK_VARS)
+    if case["solver"] == "qaoa":
+        result = dict(case, **_benchmark_qaoa(case, config))
+    else:
+        result = dict(case, **_benchmark_adiabatic(case, config))
+
+    graph = benchmark_graph(case["family"], case["num_nodes"], bench_vars.EDGE_PROB, bench_vars.SEED)
+    result["set_size"], result["independent"], result["approximation_ratio"] = approximation_ratio(
+        graph, result["bitstring"], bench_vars.EXACT_TIME_LIMIT
+    )
+    result["peak_memory_mb"] = peak_memory_mb()
+
+    import matplotlib.pyplot as plt
+
+    plt.close("all")
+    return result
+
+
+def _metadata(config):
+    """Versions and configuration of a benchmark run, to tell apart the runs being compared."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit.strip() if commit else None,
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "networkx": nx.__version__,
+        "pennylane": qml.__version__,
+        "machine": platform.machine(),
+        "cpu_count": multiprocessing.cpu_count(),
+        "config": {key: config[key] for key in ["BENCHMARK_VARS", "QAOA_VARS", "ADIABATIC_VARS"]},
+    }
+
+
+def run_benchmarks(config):
+    """
+    Run every benchmark case of the configuration, one after the other.
+
+    With BENCHMARK_VARS.ISOLATE, each case runs in its own freshly forked process, so the devices and caches of a
+    case do not carry over to the next, and the peak memory is that of the case (on top of the forked parent).
+
+    Args:
+        config (dotdict): Configuration parameters, with the benchmark in BENCHMARK_VARS.
+
+    Returns:
+        dict: The "metadata" of the run and the "results" of the cases, in the order of `benchmark_cases`.
+    """
+    bench_vars = dotdict(config.BENCHMARK_VARS)
+    tasks = [(case, config) for case in benchmark_cases(bench_vars)]
+    if dotdict(config.QAOA_VARS).SIMULATOR == "lightcone":
+        num_tasks = len(tasks)
+        tasks = [(case, config) for case, config in tasks if case["solver"] != "qaoa" or case["depth"] == 1]
+        if len(tasks) < num_tasks:
+            print(f"Skipping {num_tasks - len(tasks)} QAOA cases of depth > 1, which the lightcone simulator lacks.")
+    print(f"Running {len(tasks)} benchmark cases!")
+
+    if bench_vars.ISOLATE:
+        with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+            results = pool.imap(run_case, tasks)
+            results = [_report(i, len(tasks), result) for i, result in enumerate(results, 1)]
+    else:
+        results = [_report(i, len(tasks), run_case(task)) for i, task in enumerate(tasks, 1)]
+    return {"metadata": _metadata(config), "results": results}
+
+
+def _report(i, num_cases, result):
+    """Print a one line summary of a result, and return it."""
+    ratio = result["approximation_ratio"]
+    print(
+        f"[{i}/{num_cases}] {result['solver']} {result['family']} n={result['num_nodes']} depth={result['depth']}: "
+        f"ratio={'n/a' if ratio is None else f'{ratio:.3f}'} in {result['solve_time']:.2f}s, "
+        f"{result['circuit_evaluations']} evaluations"
+    )
+    return result
+
+
+def compare_benchmarks(old, new, metrics=("time_per_step", "circuit_evaluations", "approximation_ratio")):
+    """
+    Compare two benchmark runs case by case.
+
+    Args:
+        old (dict): A run of `run_benchmarks`, e.g. loaded from the JSON output of a previous version.
+        new (dict): Another run.
+        metrics (tuple, optional): The metrics compared. Defaults to the time per step, circuit evaluations and
+            approximation ratio.
+
+    Returns:
+        list: For each case of both runs, a `(case, {metric: (old, new, new / old)})` tuple.
+    """
+
+    def key(result):
+        return result["solver"], result["family"], result["num_nodes"], result["depth"]
+
+    old_results = {key(result): result for result in old["results"]}
+    comparison = []
+    for result in new["results"]:
+        if key(result) not in old_results:
+            continue
+        changes = {}
+        for metric in metrics:
+            before, after = old_results[key(result)].get(metric), result.get(metric)
+            changes[metric] = (before, after, after / before if before and after is not None else None)
+        comparison.append((key(result), changes))
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the MIS solvers over graph families and sizes.")
+    parser.add_argument("--config", default="config.yml", help="Configuration file, with the BENCHMARK_VARS.")
+    parser.add_argument("--output", help="JSON output file, overriding BENCHMARK_VARS.OUTPUT_FILE.")
+    parser.add_argument("--compare", help="JSON output of a previous run, to compare the new results against.")
+    args = parser.parse_args()
+
+    config = dotdict(yaml.safe_load(open(args.config)))
+    run = run_benchmarks(config)
+    output_file = args.output or config.BENCHMARK_VARS["OUTPUT_FILE"]
+    with open(output_file, "w") as f:
+        json.dump(run, f, indent=2, sort_keys=True)
+    print(f"Saved the benchmark results to {output_file}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        for case, changes in compare_benchmarks(previous, run):
+            ratios = ", ".join(
+                f"{metric} x{ratio:.2f}" if ratio is not None else f"{metric} n/a"
+                for metric, (_, _, ratio) in changes.items()
+            )
+            print(f"{' '.join(map(str, case))}: {ratios}")
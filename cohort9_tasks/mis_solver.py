@@ -1,14 +1,75 @@
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
 import yaml
-from utils.dict_utils import dotdict
-from task_4.qaoa import PennylaneMIS_QAOA
-from task_4.adiabatic import AdiabaticMIS
-from pennylane import numpy as np
+from utils.cache_utils import ResultCache
+from utils.dict_utils import dotdict, plot_distribution
+from utils.graph_utils import approximation_ratio
+from utils.log_utils import peak_memory_mb
+from task_4.instrumentation import Instrumentation
+import numpy as np
 import networkx as nx
 
+# The solver backends (PennyLane for QAOA, Pulser and QuTiP for the adiabatic solver) and matplotlib are imported
+# by the functions that use them, so a run only pays the startup time of the solvers it runs, and of the plots if
+# DRAW_PLOTS is set.
+
 config = yaml.safe_load(open("config.yml"))
 config = dotdict(config)
 
 
+def get_cache(config):
+    """
+    Open the result cache configured in CACHE_VARS.
+
+    Args:
+        config (dotdict): Configuration parameters.
+
+    Returns:
+        ResultCache: The cache, or None if it is disabled.
+    """
+    cache_vars = dotdict(config.CACHE_VARS or {})
+    if not cache_vars.ENABLED:
+        return None
+    return ResultCache(cache_vars.DIRECTORY or "cache", cache_vars.MAX_ENTRIES or 10000, cache_vars.MAX_SIZE_MB or 100)
+
+
+def get_instrumentation(config):
+    """
+    Create the solver instrumentation configured in INSTRUMENTATION_VARS.
+
+    Args:
+        config (dotdict): Configuration parameters.
+
+    Returns:
+        Instrumentation: The instrumentation, disabled unless INSTRUMENTATION_VARS.ENABLED.
+    """
+    instrumentation_vars = dotdict(config.INSTRUMENTATION_VARS or {})
+    return Instrumentation(
+        enabled=bool(instrumentation_vars.ENABLED),
+        profile=bool(instrumentation_vars.PROFILE),
+        trace_memory=bool(instrumentation_vars.TRACE_MEMORY),
+    )
+
+
+def print_instrumentation(instrumentation):
+    """Print the time and count of every phase of an enabled instrumentation, and its profiles."""
+    if not instrumentation.enabled:
+        return
+    report = instrumentation.report()
+    for name, seconds in sorted(report["timers"].items(), key=lambda item: -item[1]):
+        print(f"{name}: {seconds:.3f}s over {report['counters'][name]} calls")
+    if "steps" in report["counters"]:
+        print(f"steps: {report['counters']['steps']}")
+    for name, peak in report["peak_memory_mb"].items():
+        print(f"{name} peak traced memory: {peak:.1f} MB")
+    for name, profile in report["profiles"].items():
+        print(f"Profile of {name}:\n{profile}")
+
+
 def qaoa_solver(config):
     """
     Solve the Maximum Independent Set (MIS) problem using the gate-based Quantum Approximate Optimization Algorithm (QAOA).
@@ -25,9 +86,12 @@ def qaoa_solver(config):
 
     print("Running the QAOA solver!")
 
+    from task_4.qaoa import PennylaneMIS_QAOA
+
     qaoa_vars = dotdict(config.QAOA_VARS.copy())
     device = qaoa_vars.SIMULATOR
     plot_wait_time = config.PLOT_WAIT_TIME
+    cache = get_cache(config)
 
     if qaoa_vars.RANDOM_GRAPH:
         # Generate a random graph
@@ -37,37 +101,137 @@ def qaoa_solver(config):
             qaoa_vars.SEED,
         )
         graph = nx.fast_gnp_random_graph(n=num_nodes, p=edge_probs, seed=seed)
-        solver = PennylaneMIS_QAOA(graph=graph, device=device)
+        solver = PennylaneMIS_QAOA(
+            graph=graph,
+            device=device,
+            precision=qaoa_vars.PRECISION or "double",
+            instrumentation=get_instrumentation(config),
+            constrained=qaoa_vars.CONSTRAINED if qaoa_vars.CONSTRAINED is not None else True,
+        )
     else:
         # Use a pre-defined graph with the specified number of nodes
         num_nodes = config.NUM_NODES
-        solver = PennylaneMIS_QAOA(num_nodes, device=device)
+        solver = PennylaneMIS_QAOA(
+            num_nodes,
+            device=device,
+            precision=qaoa_vars.PRECISION or "double",
+            instrumentation=get_instrumentation(config),
+            constrained=qaoa_vars.CONSTRAINED if qaoa_vars.CONSTRAINED is not None else True,
+        )
 
     # Draw the generated graph
-    solver.draw_graph("Generated Graph", plot_wait_time=plot_wait_time)
+    if config.DRAW_PLOTS:
+        solver.draw_graph("Generated Graph", plot_wait_time=plot_wait_time)
 
     # Solve the MIS problem using the QAOA algorithm
-    solver.solve(
+    optimize_kwargs = dict(
+        steps=qaoa_vars.STEPS,  # Number of optimization steps
+        logs_file=qaoa_vars.LOG_FILE,
+        diff_method=qaoa_vars.DIFF_METHOD or "best",
+        log_flush_every=qaoa_vars.LOG_FLUSH_EVERY or 100,
+        optimizer=qaoa_vars.OPTIMIZER or "gd",
+        stepsize=qaoa_vars.STEPSIZE or 0.01,
+        cost_tol=qaoa_vars.COST_TOL,
+        grad_tol=qaoa_vars.GRAD_TOL,
+    )
+    solve_kwargs = dict(
+        optimize_kwargs,
         qaoa_layer_params=qaoa_vars.QAOA_LAYER_PARAMS,
         qaoa_layer_depth=qaoa_vars.QAOA_LAYER_DEPTH,
-        steps=qaoa_vars.STEPS,  # Note: Using SEED as the number of optimization steps
-        logs_file=qaoa_vars.LOG_FILE,
+        shots=qaoa_vars.COST_SHOTS,
+        cache=cache,
+        checkpoint_file=qaoa_vars.CHECKPOINT_FILE,  # Periodic checkpoints of the optimization
+        checkpoint_every=qaoa_vars.CHECKPOINT_EVERY or 10,
+        resume_from=qaoa_vars.RESUME_FROM,  # Checkpoint to resume from
     )
-
-    # Get the probabilities of all possible states
-    probs = solver.get_probs(config.DRAW_PLOTS, plot_wait_time=plot_wait_time)
-
-    # Get the solution (the state with the highest probability)
-    ans = np.argmax(probs)
-    ans_nodes = bin(ans)[2:]  # Convert the solution to a bitstring
+    partition_overlap = qaoa_vars.PARTITION_OVERLAP if qaoa_vars.PARTITION_OVERLAP is not None else 1
+    if qaoa_vars.KERNELIZE:
+        # Solve the kernel left by the MIS reduction rules, and lift the solution back
+        ans_nodes = solver.solve_kernel(
+            split_components=qaoa_vars.SPLIT_COMPONENTS,
+            workers=qaoa_vars.WORKERS,
+            max_qubits=qaoa_vars.MAX_QUBITS,
+            overlap=partition_overlap,
+            top_k=qaoa_vars.DECODE_TOP_K or 16,
+            **solve_kwargs,
+        )
+    elif qaoa_vars.MAX_QUBITS and solver.num_nodes > qaoa_vars.MAX_QUBITS:
+        # Solve overlapping parts of at most MAX_QUBITS nodes, and reconcile their solutions
+        ans_nodes = solver.solve_partitioned(
+            max_qubits=qaoa_vars.MAX_QUBITS,
+            overlap=partition_overlap,
+            seed=qaoa_vars.SEED,
+            workers=qaoa_vars.WORKERS,
+            top_k=qaoa_vars.DECODE_TOP_K or 16,
+            **solve_kwargs,
+        )
+    elif qaoa_vars.SPLIT_COMPONENTS:
+        # Solve each connected component with its own, smaller, QAOA circuit
+        ans_nodes = solver.solve_components(
+            workers=qaoa_vars.WORKERS, top_k=qaoa_vars.DECODE_TOP_K or 16, **solve_kwargs
+        )
+    else:
+        if qaoa_vars.WARM_START:
+            # Optimize depth 1, 2, ..., QAOA_LAYER_DEPTH, each warm-started from the previous depth, from the default
+            # depth 1 parameters and without checkpoints, which are per depth
+            history = solver.solve_depth_ladder(
+                max_depth=qaoa_vars.QAOA_LAYER_DEPTH,
+                warm_start=qaoa_vars.WARM_START,
+                shots=qaoa_vars.COST_SHOTS,
+                cache=cache,
+                **optimize_kwargs,
+            )
+            for result in history:
+                print(f"Depth {result['depth']}: cost = {result['cost']:.4f}")
+        elif (qaoa_vars.NUM_STARTS or 1) > 1:
+            # Optimize NUM_STARTS initial parameter sets as one batch, and keep the best
+            costs = solver.solve_multistart(
+                num_starts=qaoa_vars.NUM_STARTS,
+                qaoa_layer_depth=qaoa_vars.QAOA_LAYER_DEPTH,
+                seed=qaoa_vars.SEED,
+                **optimize_kwargs,
+            )
+            print(f"Final cost of each start: {costs}")
+        else:
+            solver.solve(**solve_kwargs)
+
+        if device == "lightcone":
+            # No statevector: decode the probability of each node to be in the MIS, computed in closed form
+            decoded = solver.decode_marginals()
+        elif qaoa_vars.SHOTS:
+            # Sample bitstrings instead of computing the probabilities of all 2^n states
+            counts = solver.sample(qaoa_vars.SHOTS, seed=qaoa_vars.SEED)
+            if config.DRAW_PLOTS:
+                plot_distribution(dict(counts.most_common(qaoa_vars.DECODE_TOP_K or 16)))
+
+            # Get the solution: the best independent set decoded from the most sampled bitstrings
+            decoded = solver.decode_counts(counts, qaoa_vars.DECODE_TOP_K or 16)
+        else:
+            # Get the probabilities of all possible states
+            probs = solver.get_probs(config.DRAW_PLOTS, plot_wait_time=plot_wait_time)
+
+            # Get the solution: the best independent set decoded from the most probable states
+            decoded = solver.decode_probs(probs, qaoa_vars.DECODE_TOP_K or 16)
+        ans_nodes = decoded["bitstring"]
+        if device == "lightcone":
+            print(f"Decoded an independent set of {decoded['size']} nodes from the marginals")
+        else:
+            print(
+                f"Decoded from state {decoded['state']} with probability {decoded['probability']:.4f} "
+                f"({'valid' if decoded['valid'] else 'repaired'})"
+            )
 
     # Set the MIS nodes based on the solution
     solver.set_mis_nodes(ans_nodes)
     ans = solver.mis_nodes
     print(f"QAOA Solution: {ans}")
+    if peak_memory_mb() is not None:
+        print(f"Peak memory: {peak_memory_mb():.1f} MB")
+    print_instrumentation(solver.instrumentation)
 
     # Draw the graph with the MIS nodes highlighted
-    solver.draw_graph("MIS nodes (in green)", with_mis_nodes=True, plot_wait_time=plot_wait_time)
+    if config.DRAW_PLOTS:
+        solver.draw_graph("MIS nodes (in green)", with_mis_nodes=True, plot_wait_time=plot_wait_time)
 
 
 def adiabatic_solver(config):
@@ -82,45 +246,308 @@ def adiabatic_solver(config):
     """
 
     print("Running the Adiabatic Solver!")
+    from task_4.adiabatic import AdiabaticMIS
 
     num_nodes = config.NUM_NODES
     ada_vars = dotdict(config.ADIABATIC_VARS)
     plot_wait_time = config.PLOT_WAIT_TIME
 
     # Create an instance of the AdiabaticMIS solver
-    solver = AdiabaticMIS(num_nodes, ada_vars.DISTANCE_MULTIPLIER, plot_wait_time=plot_wait_time)
+    solver = AdiabaticMIS(
+        num_nodes,
+        ada_vars.DISTANCE_MULTIPLIER,
+        plot_wait_time=plot_wait_time,
+        lattice=ada_vars.LATTICE or "square",
+        vacancy_fraction=ada_vars.VACANCY_FRACTION or 0.0,
+        seed=ada_vars.LATTICE_SEED,
+        instrumentation=get_instrumentation(config),
+    )
 
     # Draw the generated graph
-    solver.draw_graph(title="Generated Graph", plot_wait_time=plot_wait_time)
+    if config.DRAW_PLOTS:
+        solver.draw_graph(title="Generated Graph", plot_wait_time=plot_wait_time)
 
     # Solve the MIS problem using the adiabatic quantum algorithm
-    counts = solver.solve(
+    solve_kwargs = dict(
         rabi_f=ada_vars.RABI_FREQUENCY,  # Rabi frequency
         delta_0=ada_vars.DELTA_0,  # Initial detuning
         delta_f=ada_vars.DELTA_F,  # Final detuning
         T=ada_vars.TOTAL_TIME,  # Total time
-        draw_plots=config.DRAW_PLOTS,  # Whether to draw plots or not
-    ).most_common(3)
+        backend=ada_vars.BACKEND,  # Emulator backend
+        cache=get_cache(config),  # Result cache
+    )
+    if ada_vars.KERNELIZE:
+        # Emulate the kernel left by the MIS reduction rules, and lift the solution back
+        ans = solver.solve_kernel(**solve_kwargs)
+        print(f"Adiabatic Solution: {ans}")
+    elif ada_vars.SPLIT_COMPONENTS:
+        # Emulate each connected component with its own, smaller, register
+        ans = solver.solve_components(workers=ada_vars.WORKERS, **solve_kwargs)
+        print(f"Adiabatic Solution: {ans}")
+    else:
+        counts = solver.solve(
+            **solve_kwargs,
+            draw_plots=config.DRAW_PLOTS,  # Whether to draw plots or not
+        )
 
-    # Get the solution (the state with the highest count)
-    ans = counts[0][0]  # [::-1]
+        # Get the solution: the best independent set decoded from the most common bitstrings
+        decoded = solver.decode_counts(counts)
+        ans = decoded["bitstring"]
 
-    # Print the adiabatic solution
-    print(f"Adiabatic Solution: {counts}")
+        # Print the adiabatic solution
+        print(f"Adiabatic Solution: {counts.most_common(3)}")
+        print(
+            f"Decoded from state {decoded['state']} with probability {decoded['probability']:.4f} "
+            f"({'valid' if decoded['valid'] else 'repaired'})"
+        )
 
     # Set the MIS nodes based on the solution
     solver.set_mis_nodes(ans)
+    print_instrumentation(solver.instrumentation)
 
     # Draw the graph with the MIS nodes highlighted
-    solver.draw_graph(title="Adiabatic Solution", with_mis_nodes=True, plot_wait_time=plot_wait_time)
+    if config.DRAW_PLOTS:
+        solver.draw_graph(title="Adiabatic Solution", with_mis_nodes=True, plot_wait_time=plot_wait_time)
+
+
+def sweep_instances(sweep_vars):
+    """
+    List the (num_nodes, edge_probs, seed) instances of a sweep.
+
+    Args:
+        sweep_vars (dotdict): The SWEEP_VARS configuration.
+
+    Returns:
+        list: The explicit INSTANCES if given, else the grid NUM_NODES x EDGE_PROBS x SEEDS.
+    """
+    if sweep_vars.INSTANCES:
+        return [tuple(instance) for instance in sweep_vars.INSTANCES]
+    return list(itertools.product(sweep_vars.NUM_NODES, sweep_vars.EDGE_PROBS, sweep_vars.SEEDS))
+
+
+def _sweep_worker_init():
+    """
+    Make the sweep workers headless. matplotlib is only imported by the code drawing figures, so it is pointed to
+    the Agg backend through the environment, unless a forked worker inherited it already imported.
+    """
+    os.environ["MPLBACKEND"] = "Agg"
+    if "matplotlib" in sys.modules:
+        sys.modules["matplotlib"].use("Agg")
+
+
+def _sweep_worker(args):
+    """
+    Solve a single sweep instance without any plotting.
+
+    Args:
+        args (tuple): `(solver, (num_nodes, edge_probs, seed), config)`, where solver is "qaoa" or "adiabatic".
+
+    Returns:
+        dict: The instance, solution bitstring, approximation ratio, timings and the peak memory of the worker
+            process so far, with the time and count of each solver phase if INSTRUMENTATION_VARS.ENABLED.
+    """
+    solver_name, (num_nodes, edge_probs, seed), config = args
+    if solver_name == "qaoa":
+        from task_4.qaoa import PennylaneMIS_QAOA
+    else:
+        from task_4.adiabatic import AdiabaticMIS
+
+    result = {"solver": solver_name, "num_nodes": num_nodes, "edge_probs": edge_probs, "seed": seed}
+    start = time.perf_counter()
+
+    if solver_name == "qaoa":
+        qaoa_vars = dotdict(config.QAOA_VARS)
+        graph = nx.fast_gnp_random_graph(n=num_nodes, p=edge_probs, seed=seed)
+        solver = PennylaneMIS_QAOA(
+            graph=graph,
+            device=qaoa_vars.SIMULATOR,
+            reuse_device=True,
+            precision=qaoa_vars.PRECISION or "double",
+            instrumentation=get_instrumentation(config),
+            constrained=qaoa_vars.CONSTRAINED if qaoa_vars.CONSTRAINED is not None else True,
+        )
+        result["setup_time"] = time.perf_counter() - start
+
+        solver.solve(
+            qaoa_layer_depth=qaoa_vars.QAOA_LAYER_DEPTH,
+            steps=qaoa_vars.STEPS,
+            diff_method=qaoa_vars.DIFF_METHOD or "best",
+            optimizer=qaoa_vars.OPTIMIZER or "gd",
+            stepsize=qaoa_vars.STEPSIZE or 0.01,
+            cost_tol=qaoa_vars.COST_TOL,
+            grad_tol=qaoa_vars.GRAD_TOL,
+            shots=qaoa_vars.COST_SHOTS,
+            cache=get_cache(config),
+        )
+        result["solve_time"] = time.perf_counter() - start - result["setup_time"]
+
+        if qaoa_vars.SIMULATOR == "lightcone":
+            solver.decode_marginals()
+            result["probability"] = None
+        elif qaoa_vars.SHOTS:
+            counts = solver.sample(qaoa_vars.SHOTS, seed=seed)
+            solver.decode_counts(counts, qaoa_vars.DECODE_TOP_K or 16)
+            result["probability"] = counts.most_common(1)[0][1] / qaoa_vars.SHOTS
+        else:
+            probs = solver.get_probs(False)
+            solver.decode_probs(probs, qaoa_vars.DECODE_TOP_K or 16)
+            result["probability"] = float(np.max(probs))
+    else:
+        ada_vars = dotdict(config.ADIABATIC_VARS)
+        solver = AdiabaticMIS(
+            num_nodes,
+            ada_vars.DISTANCE_MULTIPLIER,
+            lattice=ada_vars.LATTICE or "square",
+            vacancy_fraction=ada_vars.VACANCY_FRACTION or 0.0,
+            seed=ada_vars.LATTICE_SEED,
+            instrumentation=get_instrumentation(config),
+        )
+        graph = solver.graph
+        result["setup_time"] = time.perf_counter() - start
+
+        counts = solver.solve(
+            rabi_f=ada_vars.RABI_FREQUENCY,
+            delta_0=ada_vars.DELTA_0,
+            delta_f=ada_vars.DELTA_F,
+            T=ada_vars.TOTAL_TIME,
+            backend=ada_vars.BACKEND,
+            draw_plots=False,
+            cache=get_cache(config),
+        )
+        result["solve_time"] = time.perf_counter() - start - result["setup_time"]
+
+        # the best independent set of the most common bitstrings, as for QAOA
+        result["probability"] = solver.decode_counts(counts)["probability"]
+
+    result["bitstring"] = solver.mis_nodes
+    result["set_size"], result["independent"], result["approximation_ratio"] = approximation_ratio(
+        graph, solver.mis_nodes, dotdict(config.SWEEP_VARS).EXACT_TIME_LIMIT
+    )
+    result["total_time"] = time.perf_counter() - start
+    result["peak_memory_mb"] = peak_memory_mb()
+    if solver.instrumentation.enabled:
+        result["phase_times"] = dict(solver.instrumentation.timers)
+        result["phase_counts"] = dict(solver.instrumentation.counters)
+    return result
+
+
+def _sweep_batch_worker(args):
+    """
+    Solve sweep instances of the same size as one batch with `PennylaneMIS_QAOA.solve_batch`, without any plotting.
+
+    Args:
+        args (tuple): `(instances, config)`, where all instances have the same number of nodes.
+
+    Returns:
+        list: The result of each instance, see `_sweep_worker`. The setup and solve times of the batch are split
+            evenly between its instances.
+    """
+    from task_4.qaoa import PennylaneMIS_QAOA
+
+    instances, config = args
+    qaoa_vars = dotdict(config.QAOA_VARS)
+    start = time.perf_counter()
+    graphs = [nx.fast_gnp_random_graph(n=n, p=edge_probs, seed=seed) for n, edge_probs, seed in instances]
+    setup_time = time.perf_counter() - start
+
+    solvers = PennylaneMIS_QAOA.solve_batch(
+        graphs,
+        qaoa_layer_depth=qaoa_vars.QAOA_LAYER_DEPTH,
+        steps=qaoa_vars.STEPS,
+        optimizer=qaoa_vars.OPTIMIZER or "gd",
+        stepsize=qaoa_vars.STEPSIZE or 0.01,
+        cost_tol=qaoa_vars.COST_TOL,
+        grad_tol=qaoa_vars.GRAD_TOL,
+        precision=qaoa_vars.PRECISION or "double",
+        instrumentation=get_instrumentation(config),
+    )
+    solve_time = time.perf_counter() - start - setup_time
+
+    results = []
+    for (num_nodes, edge_probs, seed), graph, solver in zip(instances, graphs, solvers):
+        result = {"solver": "qaoa", "num_nodes": num_nodes, "edge_probs": edge_probs, "seed": seed}
+        result["setup_time"] = setup_time / len(instances)
+        result["solve_time"] = solve_time / len(instances)
+        result["batch_size"] = len(instances)
+
+        probs = solver.get_probs(False)
+        solver.decode_probs(probs, qaoa_vars.DECODE_TOP_K or 16)
+        result["probability"] = float(np.max(probs))
+        result["bitstring"] = solver.mis_nodes
+        result["set_size"], result["independent"], result["approximation_ratio"] = approximation_ratio(
+            graph, solver.mis_nodes, dotdict(config.SWEEP_VARS).EXACT_TIME_LIMIT
+        )
+        result["total_time"] = result["setup_time"] + result["solve_time"]
+        result["peak_memory_mb"] = peak_memory_mb()
+        if solver.instrumentation.enabled:
+            # shared by the solvers of the batch
+            result["phase_times"] = dict(solver.instrumentation.timers)
+            result["phase_counts"] = dict(solver.instrumentation.counters)
+        results.append(result)
+    return results
+
+
+def _sweep_task(args):
+    """Run a sweep task, a single instance or a batch of QAOA instances, and return the list of its results."""
+    if args[0] == "qaoa-batch":
+        return _sweep_batch_worker(args[1:])
+    return [_sweep_worker(args)]
+
+
+def sweep(config):
+    """
+    Solve many MIS instances in parallel, without any plotting.
+
+    Args:
+        config (dotdict): Configuration parameters, with the sweep in SWEEP_VARS.
+
+    The instances of SWEEP_VARS are solved by every solver selected in SOLVERS, across a process pool.
+    The adiabatic solver embeds square graphs, so it runs once per distinct number of nodes. Each result is
+    appended to SWEEP_VARS.RESULTS_FILE as a JSON line as soon as it is available.
+    """
+    sweep_vars = dotdict(config.SWEEP_VARS)
+    solvers = ["qaoa", "adiabatic"] if config.SOLVERS.lower() == "both" else [config.SOLVERS.lower()]
+    instances = sweep_instances(sweep_vars)
+
+    tasks = []
+    if "qaoa" in solvers and sweep_vars.BATCH_GRAPHS:
+        # instances of the same size are simulated together, see PennylaneMIS_QAOA.solve_batch
+        for n in sorted({instance[0] for instance in instances}):
+            tasks.append(("qaoa-batch", [instance for instance in instances if instance[0] == n], config))
+    elif "qaoa" in solvers:
+        tasks += [("qaoa", instance, config) for instance in instances]
+    if "adiabatic" in solvers:
+        # square graphs only depend on the number of nodes
+        num_nodes = sorted({instance[0] for instance in instances})
+        tasks += [("adiabatic", (n, None, None), config) for n in num_nodes]
+    num_results = sum(len(task[1]) if task[0] == "qaoa-batch" else 1 for task in tasks)
+    print(f"Running a sweep of {num_results} instances!")
+
+    with multiprocessing.Pool(sweep_vars.WORKERS, initializer=_sweep_worker_init) as pool, open(
+        sweep_vars.RESULTS_FILE, "a"
+    ) as results_file:
+        results = (result for task_results in pool.imap_unordered(_sweep_task, tasks) for result in task_results)
+        for i, result in enumerate(results, 1):
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            ratio = result["approximation_ratio"]
+            print(
+                f"[{i}/{num_results}] {result['solver']} n={result['num_nodes']} p={result['edge_probs']} "
+                f"seed={result['seed']}: ratio={'n/a' if ratio is None else f'{ratio:.3f}'} "
+                f"in {result['total_time']:.2f}s"
+            )
 
 
 if __name__ == "__main__":
     solver = config.SOLVERS.lower()
     assert solver in ["qaoa", "adiabatic", "both"], f"Unknown solver: {solver} given."
 
-    if solver in ["qaoa", "both"]:
-        qaoa_solver(config)
+    if config.SWEEP_VARS and config.SWEEP_VARS.get("ENABLED"):
+        sweep(config)
+
+    else:
+        if solver in ["qaoa", "both"]:
+            qaoa_solver(config)
 
-    if solver in ["adiabatic", "both"]:
-        adiabatic_solver(config)
+        if solver in ["adiabatic", "both"]:
+            adiabatic_solver(config)
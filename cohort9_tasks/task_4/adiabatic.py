@@ -1,10 +1,13 @@
+import time
+from collections import Counter
 import numpy as np
 from pulser import Pulse, Sequence, Register
-from pulser_simulation import QutipEmulator
 from pulser.devices import DigitalAnalogDevice
 from pulser.waveforms import InterpolatedWaveform
-import matplotlib.pyplot as plt
-from .mis import MISGraph
+from .mis import MISGraph, map_components
+from .decoding import decode_counts
+from .instrumentation import instrumented
+from .blockade_emulator import BlockadeSubspaceEmulator
 
 import sys
 
@@ -19,31 +22,58 @@ class AdiabaticMIS(MISGraph):
     Maximum Independent Set (MIS) problem on a graph.
     """
 
-    def __init__(self, num_nodes, distance_multiplier=8, plot_wait_time=False):
+    def __init__(
+        self,
+        num_nodes,
+        distance_multiplier=8,
+        plot_wait_time=False,
+        lattice="square",
+        vacancy_fraction=0.0,
+        seed=None,
+        instrumentation=None,
+    ):
         """
         Initialize the AdiabaticMIS object.
 
         Args:
             num_nodes (int): The number of nodes in the graph.
             distance_multiplier (float, optional): A multiplier for the node coordinates. Defaults to 8.
+            lattice (str, optional): The lattice of the atoms, "square" or "triangular", see `get_square_graph`.
+                Defaults to "square".
+            vacancy_fraction (float, optional): Fraction of the lattice sites left empty. Defaults to 0.
+            seed (int, optional): Seed of the vacancies. Defaults to None.
+            instrumentation (Instrumentation, optional): Timers, counters and profiling hooks, see `MISGraph`.
+                Defaults to None, for a disabled one.
         """
-        super().__init__()
+        super().__init__(instrumentation)
         self.num_nodes = num_nodes
-        self.graph, self.coords = get_square_graph(self.num_nodes)
+        self.lattice_kwargs = {"lattice": lattice, "vacancy_fraction": vacancy_fraction, "seed": seed}
+        self.graph, self.coords = get_square_graph(self.num_nodes, **self.lattice_kwargs)
         self.coords = np.array(self.coords) * distance_multiplier
+        self.distance_multiplier = distance_multiplier
         self.plot_wait_time = plot_wait_time
 
-    def convert_qubo_2_atomic_reg(self):
+    def convert_qubo_2_atomic_reg(self, nodes=None, draw=True):
         """
         Convert the QUBO problem to a register of atomic qubits with their coordinates.
 
+        Args:
+            nodes (list, optional): Nodes to place in the register. Defaults to None, for all the nodes.
+            draw (bool, optional): Whether to draw the register. Defaults to True.
+
         Returns:
             Register: A register of atomic qubits with their coordinates.
         """
         # coords
-        coords = self.coords
-        qubits = dict(enumerate(coords))
+        if nodes is None:
+            nodes = range(self.num_nodes)
+        qubits = {node: self.coords[node] for node in nodes}
         reg = Register(qubits)
+        if not draw:
+            return reg
+
+        import matplotlib.pyplot as plt
+
         reg.draw(
             blockade_radius=DigitalAnalogDevice.rydberg_blockade_radius(1),
             draw_graph=False,
@@ -54,7 +84,19 @@ class AdiabaticMIS(MISGraph):
             plt.close()
         return reg
 
-    def solve(self, rabi_f=1, delta_0=-5, delta_f=5, T=4000, draw_plots=True):
+    @instrumented("solve")
+    def solve(
+        self,
+        rabi_f=1,
+        delta_0=-5,
+        delta_f=5,
+        T=4000,
+        draw_plots=True,
+        nodes=None,
+        backend="qutip",
+        time_step=10,
+        cache=None,
+    ):
         """
         Solve the MIS problem using an adiabatic quantum algorithm.
 
@@ -64,11 +106,46 @@ class AdiabaticMIS(MISGraph):
             delta_0 (float): Initial detuning (must be negative)
             delta_f (float): Final detuning (must be positive)
             T (int): Total time
+            nodes (list, optional): Solve the subgraph induced by these nodes only. Defaults to None, for the whole graph.
+            backend (str, optional): "qutip" to emulate the full 2^n Hilbert space with Pulser's `QutipEmulator`, or
+                "blockade" to emulate only the states allowed by the Rydberg blockade with `BlockadeSubspaceEmulator`,
+                which scales to much larger registers. Defaults to "qutip".
+            time_step (int, optional): Length (in ns) of the piecewise constant steps of the "blockade" backend.
+                Defaults to 10.
+            cache (ResultCache, optional): A cache of results (see `utils.cache_utils`). The counts are looked up for
+                the same atom positions (up to a translation) and pulse, and the emulation is skipped on a hit.
+                Otherwise, the counts and the solve time are stored. Defaults to None.
 
         Returns:
-            dict: A dictionary containing the final state counts.
+            dict: A dictionary containing the final state counts, with bitstrings in the order of `nodes`.
         """
-        reg = self.convert_qubo_2_atomic_reg()
+        if nodes is None:
+            nodes = range(self.num_nodes)
+
+        # Look up the counts in the cache. The dynamics depend on the atom positions and not only on the graph, so
+        # results are only shared by registers of the same shape, whose graphs are identical.
+        if cache is not None:
+            coords = self.coords[list(nodes)]
+            cache_params = {
+                "solver": "adiabatic",
+                "coords": np.round(coords - coords.min(axis=0), 6).tolist(),
+                "rabi_f": rabi_f,
+                "delta_0": delta_0,
+                "delta_f": delta_f,
+                "T": T,
+                "backend": backend,
+                "time_step": time_step if backend == "blockade" else None,
+            }
+            subgraph = self.induced_subgraph(nodes)
+            with self.instrumentation.phase("cache"):
+                result = cache.get(subgraph, cache_params, isomorphic=False)
+            if result is not None:
+                print("Loaded the adiabatic counts from the cache.")
+                return Counter(result["bitstrings"])
+        solve_start = time.perf_counter()
+
+        with self.instrumentation.phase("register"):
+            reg = self.convert_qubo_2_atomic_reg(nodes, draw=draw_plots)
         Omega = rabi_f  # Rabi frequency
 
         # Define the adiabatic pulse
@@ -84,22 +161,127 @@ class AdiabaticMIS(MISGraph):
         seq.add(adiabatic_pulse, "ising")
 
         if draw_plots:
-            seq.draw()
-            if self.plot_wait_time:
-                plt.pause(self.plot_wait_time)
-                plt.close()
+            import matplotlib.pyplot as plt
+
+            with self.instrumentation.phase("plot"):
+                seq.draw()
+                if self.plot_wait_time:
+                    plt.pause(self.plot_wait_time)
+                    plt.close()
 
         # Run the simulation
-        simul = QutipEmulator.from_sequence(seq)
-        results = simul.run()
-        final = results.get_final_state()
-        count_dict = results.sample_final_state()
+        if backend == "qutip":
+            # QuTiP is only imported for this backend, as it takes a large part of the startup time
+            from pulser_simulation import QutipEmulator
+
+            with self.instrumentation.phase("emulation"):
+                simul = QutipEmulator.from_sequence(seq)
+                results = simul.run()
+                final = results.get_final_state()
+            with self.instrumentation.phase("sampling"):
+                count_dict = results.sample_final_state()
+        elif backend == "blockade":
+            with self.instrumentation.phase("emulation"):
+                simul = BlockadeSubspaceEmulator(
+                    list(reg.qubits.values()),
+                    DigitalAnalogDevice.rydberg_blockade_radius(Omega),
+                    DigitalAnalogDevice.interaction_coeff,
+                )
+                simul.run(adiabatic_pulse.amplitude.samples, adiabatic_pulse.detuning.samples, time_step)
+            with self.instrumentation.phase("sampling"):
+                count_dict = simul.sample_final_state()
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+
+        if cache is not None:
+            result = {
+                "bitstrings": {bitstring: int(count) for bitstring, count in count_dict.items()},
+                "solve_time": time.perf_counter() - solve_start,
+            }
+            with self.instrumentation.phase("cache"):
+                cache.put(subgraph, cache_params, result, isomorphic=False)
 
         if draw_plots:
-            plot_distribution(count_dict)
+            with self.instrumentation.phase("plot"):
+                plot_distribution(count_dict)
 
         return count_dict
 
+    def solve_components(self, workers=None, **solve_kwargs):
+        """
+        Solve the MIS problem on each connected component of the graph independently, and stitch the solutions.
+
+        Each component with more than one node is emulated with its own register, so the emulation cost is the sum
+        of the components' costs instead of 2^num_nodes. Isolated nodes are always in the MIS and are not emulated.
+
+        Args:
+            workers (int, optional): Number of processes solving components in parallel, None for one per CPU core
+                and 1 to solve them in this process. Defaults to None.
+            **solve_kwargs: Keyword arguments passed to `solve` for every component.
+
+        Returns:
+            str: The independent set of each component decoded from its most common bitstrings, stitched into a
+                bitstring over the whole graph.
+        """
+        solve_kwargs["draw_plots"] = False
+        components = self.connected_components()
+        tasks = [
+            (self.num_nodes, self.distance_multiplier, self.lattice_kwargs, component, solve_kwargs)
+            for component in components
+            if len(component) > 1
+        ]
+
+        solutions = iter(map_components(_solve_component, tasks, workers))
+        bitstrings = ["1" if len(component) == 1 else next(solutions) for component in components]
+
+        nodes_bitstring = self.stitch_bitstrings(components, bitstrings)
+        self.set_mis_nodes(nodes_bitstring)
+        return nodes_bitstring
+
+    def solve_kernel(self, **solve_kwargs):
+        """
+        Solve the MIS problem on the kernel of the graph (see `MISGraph.kernelize`), and lift the solution back.
+
+        Folding is disabled, so the kernel is a subgraph of the atom register and keeps its unit-disk embedding.
+
+        Args:
+            **solve_kwargs: Keyword arguments passed to `solve`.
+
+        Returns:
+            str: The lifted bitstring over the whole graph, of the independent set decoded from the most common
+                bitstrings of the kernel, see `decode_counts`.
+        """
+        kernel = self.kernelize(fold=False)
+        print(f"Kernelized {self.num_nodes} nodes into {len(kernel.graph)} nodes.")
+
+        if len(kernel.graph) == 0:
+            kernel_bitstring = ""
+        else:
+            solve_kwargs["draw_plots"] = False
+            counts = self.solve(nodes=kernel.kernel_nodes, **solve_kwargs)
+            # the best independent set of the most common bitstrings, which may break the blockade
+            kernel_bitstring = decode_counts(kernel.graph, counts)["bitstring"]
+
+        nodes_bitstring = kernel.lift(kernel_bitstring)
+        self.set_mis_nodes(nodes_bitstring)
+        return nodes_bitstring
+
+
+def _solve_component(args):
+    """
+    Solve a single connected component, in a worker process of `solve_components`.
+
+    Args:
+        args (tuple): `(num_nodes, distance_multiplier, lattice_kwargs, component, solve_kwargs)`.
+
+    Returns:
+        str: The best independent set of the component decoded from its most common bitstrings, see `decode_counts`.
+    """
+    num_nodes, distance_multiplier, lattice_kwargs, component, solve_kwargs = args
+    solver = AdiabaticMIS(num_nodes, distance_multiplier, **lattice_kwargs)
+    counts = solver.solve(nodes=component, **solve_kwargs)
+    return decode_counts(solver.induced_subgraph(component), counts)["bitstring"]
+
 
 def main(num_nodes):
     solver = AdiabaticMIS(num_nodes)
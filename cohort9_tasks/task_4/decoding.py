@@ -0,0 +1,243 @@
+from collections import Counter
+import numpy as np
+import networkx as nx
+
+
+def top_k_states(probs, k=16, chunk_size=2**20, amplitudes=False):
+    """
+    Find the k most probable basis states, streaming over the probabilities in chunks.
+
+    Only the current chunk and the best k states seen so far are held in memory on top of `probs` itself, which may
+    also be an iterable of consecutive chunks, e.g. computed on the fly.
+
+    Args:
+        probs (array-like or iterable): The probabilities (or amplitudes) of all basis states, or consecutive chunks
+            of them.
+        k (int, optional): The number of states kept. Defaults to 16.
+        chunk_size (int, optional): Length of the chunks a single array is split into. Defaults to 2^20.
+        amplitudes (bool, optional): Whether `probs` holds amplitudes, whose squared moduli are the probabilities.
+            Defaults to False.
+
+    Returns:
+        tuple: The basis state indices and their probabilities, by decreasing probability.
+    """
+    if isinstance(probs, np.ndarray):
+        vector = probs
+        probs = (vector[start : start + chunk_size] for start in range(0, len(vector), chunk_size))
+
+    best_indices = np.empty(0, dtype=np.int64)
+    best_probs = np.empty(0)
+    offset = 0
+    for chunk in probs:
+        chunk = np.abs(np.asarray(chunk)) ** 2 if amplitudes else np.asarray(chunk, dtype=float)
+        if len(chunk) > k:
+            candidates = np.argpartition(chunk, -k)[-k:]
+        else:
+            candidates = np.arange(len(chunk))
+        best_indices = np.concatenate([best_indices, candidates + offset])
+        best_probs = np.concatenate([best_probs, chunk[candidates]])
+        if len(best_probs) > k:
+            keep = np.argpartition(best_probs, -k)[-k:]
+            best_indices, best_probs = best_indices[keep], best_probs[keep]
+        offset += len(chunk)
+
+    order = np.argsort(-best_probs, kind="stable")
+    return best_indices[order], best_probs[order]
+
+
+def indices_to_bits(indices, num_nodes):
+    """Bits of basis state indices, of shape (len(indices), num_nodes), with node 0 as the most significant bit."""
+    shifts = np.arange(num_nodes - 1, -1, -1)
+    return ((np.asarray(indices, dtype=np.int64)[:, np.newaxis] >> shifts) & 1).astype(np.uint8)
+
+
+def count_violations(bits, edges):
+    """
+    Number of edges with both nodes selected, for every bitstring at once.
+
+    Args:
+        bits (numpy.ndarray): Bitstrings of shape (bitstrings, nodes).
+        edges (numpy.ndarray): Node positions of the edges, of shape (edges, 2).
+
+    Returns:
+        numpy.ndarray: The number of violated edges of each bitstring.
+    """
+    if len(edges) == 0:
+        return np.zeros(len(bits), dtype=np.int64)
+    return np.sum(bits[:, edges[:, 0]] & bits[:, edges[:, 1]], axis=1)
+
+
+def repair_to_maximal(bits, graph):
+    """
+    Turn bitstrings into maximal independent sets of the graph.
+
+    Violations are repaired greedily by dropping, from every bitstring at once, the selected node with the most
+    selected neighbors, until no edge has both nodes selected. The sets are then extended by adding every node with
+    no selected neighbor, by increasing degree.
+
+    Args:
+        bits (numpy.ndarray): Bitstrings of shape (bitstrings, nodes), over the nodes in graph order.
+        graph (nx.Graph): The graph.
+
+    Returns:
+        numpy.ndarray: The repaired bitstrings, a new array.
+    """
+    bits = np.array(bits, dtype=np.int64)
+    # sparse, so that the memory grows with the edges and not the square of the nodes
+    adjacency = nx.to_scipy_sparse_array(graph, weight=None, dtype=np.int64, format="csr")
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    rows = np.arange(len(bits))
+
+    def selected_neighbors():
+        # (bits @ adjacency), with the sparse product on the left as the adjacency is symmetric
+        return (adjacency @ bits.T).T
+
+    conflicts = bits * selected_neighbors()
+    while conflicts.any():
+        worst = np.argmax(conflicts, axis=1)
+        conflicted = conflicts[rows, worst] > 0
+        bits[rows[conflicted], worst[conflicted]] = 0
+        conflicts = bits * selected_neighbors()
+
+    blocked = selected_neighbors()
+    for node in np.argsort(np.diff(adjacency.indptr), kind="stable"):
+        free = np.flatnonzero((bits[:, node] == 0) & (blocked[:, node] == 0))
+        bits[free, node] = 1
+        blocked[np.ix_(free, adjacency.indices[adjacency.indptr[node] : adjacency.indptr[node + 1]])] += 1
+    return bits.astype(np.uint8)
+
+
+def improve_by_swaps(bits, graph):
+    """
+    Grow a maximal independent set with (1,2)-swaps, a classic local search for MIS.
+
+    A selected node whose removal frees two non-adjacent neighbors, blocked by it alone, is swapped for them, and
+    the set is extended with the nodes freed by the removal, until no swap applies. Every swap grows the set, so
+    the search ends after fewer swaps than there are nodes.
+
+    Args:
+        bits (numpy.ndarray): A bitstring of shape (nodes,), over the nodes in graph order, of an independent set.
+        graph (nx.Graph): The graph.
+
+    Returns:
+        numpy.ndarray: The improved bitstring, a new array.
+    """
+    position = {node: i for i, node in enumerate(graph.nodes)}
+    neighbors = [[position[u] for u in graph.neighbors(node) if u != node] for node in graph.nodes]
+    bits = np.array(bits, dtype=np.uint8)
+    blockers = np.array([sum(bits[u] for u in neighbors[v]) for v in range(len(bits))], dtype=np.int64)
+
+    def select(v):
+        bits[v] = 1
+        for u in neighbors[v]:
+            blockers[u] += 1
+
+    improved = True
+    while improved:
+        improved = False
+        for x in np.flatnonzero(bits):
+            freed = [v for v in neighbors[x] if blockers[v] == 1]
+            pair = next(
+                ((v, w) for i, v in enumerate(freed) for w in freed[i + 1 :] if w not in neighbors[v]), None
+            )
+            if pair is None:
+                continue
+            bits[x] = 0
+            for u in neighbors[x]:
+                blockers[u] -= 1
+            for v in pair:
+                select(v)
+            for v in freed:
+                if blockers[v] == 0 and not bits[v]:
+                    select(v)
+            improved = True
+    return bits
+
+
+def decode_mis(graph, probs, k=16, chunk_size=2**20, amplitudes=False):
+    """
+    Decode the best independent set among the most probable basis states.
+
+    The k most probable states are found with `top_k_states`, checked against the edges of the graph, repaired
+    and extended to maximal independent sets with `repair_to_maximal`. The largest set is returned, the most
+    probable one among sets of the same size, so the output is always a valid independent set.
+
+    Args:
+        graph (nx.Graph): The graph, with one qubit per node in graph order.
+        probs (array-like or iterable): The probabilities (or amplitudes) of all basis states, see `top_k_states`.
+        k (int, optional): The number of states decoded. Defaults to 16.
+        chunk_size (int, optional): Length of the chunks streamed over. Defaults to 2^20.
+        amplitudes (bool, optional): Whether `probs` holds amplitudes. Defaults to False.
+
+    Returns:
+        dict: The decoded "bitstring", its "size", the basis "state" it was decoded from with its "probability",
+            and whether that state was "valid" before the repair.
+    """
+    indices, state_probs = top_k_states(probs, k, chunk_size, amplitudes)
+    return _decode_states(graph, indices, state_probs)
+
+
+def decode_counts(graph, counts, k=16):
+    """
+    Decode the best independent set among the most sampled bitstrings, like `decode_mis` for probabilities.
+
+    Args:
+        graph (nx.Graph): The graph, with one bit per node in graph order.
+        counts (dict): The number of samples of each bitstring, e.g. from `PennylaneMIS_QAOA.sample`.
+        k (int, optional): The number of bitstrings decoded. Defaults to 16.
+
+    Returns:
+        dict: The result of `decode_mis`, with the frequency of the sampled bitstring as its "probability".
+    """
+    top = Counter(counts).most_common(k)
+    total = sum(counts.values())
+    indices = np.array([int(bitstring, 2) for bitstring, _ in top], dtype=np.int64)
+    return _decode_states(graph, indices, np.array([count / total for _, count in top]))
+
+
+def _decode_states(graph, indices, state_probs):
+    """Repair the basis states `indices`, by decreasing probability, and return the best set, see `decode_mis`."""
+    num_nodes = len(graph)
+    bits = indices_to_bits(indices, num_nodes)
+
+    position = {node: i for i, node in enumerate(graph.nodes)}
+    edges = np.array([(position[u], position[v]) for u, v in graph.edges if u != v], dtype=np.int64).reshape(-1, 2)
+    valid = count_violations(bits, edges) == 0
+
+    repaired = repair_to_maximal(bits, graph)
+    best = int(np.argmax(repaired.sum(axis=1)))  # the first, most probable, of the largest sets
+    return {
+        "bitstring": "".join(map(str, repaired[best])),
+        "size": int(repaired[best].sum()),
+        "state": format(int(indices[best]), f"0{num_nodes}b"),
+        "probability": float(state_probs[best]),
+        "valid": bool(valid[best]),
+    }
+
+
+def decode_marginals(graph, marginals):
+    """
+    Decode an independent set from the probability of each node to be in the set, without any statevector.
+
+    The nodes are added greedily by decreasing probability, when none of their neighbors is in the set yet, which
+    gives a maximal independent set, then grown with `improve_by_swaps`.
+
+    Args:
+        graph (nx.Graph): The graph.
+        marginals (array-like): The probability of each node to be measured in |1>, in graph order, e.g. from
+            `LightConeQAOAEvaluator.marginals`.
+
+    Returns:
+        dict: The decoded "bitstring" and its "size".
+    """
+    position = {node: i for i, node in enumerate(graph.nodes)}
+    nodes = list(graph.nodes)
+    bits = np.zeros(len(nodes), dtype=np.uint8)
+    blocked = np.zeros(len(nodes), dtype=bool)
+    for i in np.argsort(-np.asarray(marginals), kind="stable"):
+        if not blocked[i]:
+            bits[i] = 1
+            blocked[[position[u] for u in graph.neighbors(nodes[i])]] = True
+    bits = improve_by_swaps(bits, graph)
+    return {"bitstring": "".join(map(str, bits)), "size": int(bits.sum())}
@@ -0,0 +1,528 @@
+import numpy as np
+import pennylane as qml
+
+
+class DiagonalQAOASimulator:
+    """
+    A NumPy statevector engine for QAOA circuits with a diagonal cost Hamiltonian.
+
+    The cost Hamiltonian is precomputed once as a length 2^n diagonal, so a cost layer is a single elementwise
+    phase, looked up from the few distinct eigenvalues of the diagonal. The mixer Hamiltonian is split into
+    consecutive groups of terms sharing the same X wire (e.g. the bit-flip mixer returned by
+    `qaoa.cost.max_independent_set`). The terms of a group commute, so each group is applied exactly as one
+    butterfly update on pairs of amplitudes differing only in that wire. The groups are applied in the same order
+    as PennyLane's `ApproxTimeEvolution`, so results match the QNode path to numerical tolerance.
+
+    Parameters may have leading batch dimensions, e.g. shape (K, 2, depth) for K parameter sets, which are then
+    simulated together on a (K, 2^n) array of statevectors sharing the precomputed diagonal and mixer groups.
+    This saves the Python overhead of K separate simulations on small graphs. Larger batches are split into
+    chunks of about `BATCH_AMPLITUDES` amplitudes, as one statevector at a time is faster once a batch no longer
+    fits in the CPU cache.
+
+    Layers are applied in place, over blocks of `CHUNK_AMPLITUDES` amplitudes, so their temporaries never exceed
+    a few blocks whatever the number of qubits. With `dtype=np.complex64`, the statevectors and the cost diagonal
+    are stored in single precision, which halves the memory of a simulation.
+    """
+
+    BATCH_AMPLITUDES = 2**15
+    CHUNK_AMPLITUDES = 2**16
+
+    def __init__(self, cost_h, mixer_h, num_nodes, dtype=np.complex128):
+        """
+        Initialize the simulator and precompute the cost diagonal and mixer groups.
+
+        Args:
+            cost_h (qml.Hamiltonian): Cost Hamiltonian, written only in terms of PauliZ and Identity.
+            mixer_h (qml.Hamiltonian): Mixer Hamiltonian, each term an X on one wire times PauliZ/Identity.
+            num_nodes (int): The number of qubits (wires `0..num_nodes - 1`).
+            dtype (numpy.dtype, optional): Complex dtype of the statevectors, np.complex128 or np.complex64.
+                Defaults to np.complex128.
+        """
+        self.num_nodes = num_nodes
+        self.wire_map = {wire: wire for wire in range(num_nodes)}
+        self.dtype = np.dtype(dtype)
+        self.real_dtype = np.finfo(self.dtype).dtype
+
+        self.cost_diag = self._diagonal(cost_h, np.arange(2**num_nodes)).astype(self.real_dtype)
+        self.cost_levels, self.cost_index = self._levels(self.cost_diag)
+        self.mixer_groups = self._mixer_groups(mixer_h)
+
+    def _pauli_words(self, hamiltonian):
+        """Yield `(coeff, word)` pairs, where `word` is a Pauli string over all wires."""
+        for coeff, op in zip(hamiltonian.coeffs, hamiltonian.ops):
+            word = qml.pauli.pauli_word_to_string(op, wire_map=self.wire_map)
+            yield float(coeff), word
+
+    def _z_signs(self, word, index):
+        """Eigenvalues of the PauliZ part of `word` for the basis states in `index` (wire 0 is the most significant bit)."""
+        signs = np.ones(len(index))
+        for wire, pauli in enumerate(word):
+            if pauli == "Z":
+                signs *= 1 - 2 * ((index >> (self.num_nodes - 1 - wire)) & 1)
+        return signs
+
+    def _diagonal(self, hamiltonian, index):
+        """Diagonal of a Hamiltonian made of PauliZ/Identity terms."""
+        diag = np.zeros(len(index))
+        for coeff, word in self._pauli_words(hamiltonian):
+            if set(word) - {"I", "Z"}:
+                raise ValueError(f"Cost Hamiltonian must be diagonal, got term {word}.")
+            diag += coeff * self._z_signs(word, index)
+        return diag
+
+    def _levels(self, values):
+        """Split `values` into a table of distinct levels and a compact index into that table."""
+        levels, level_index = np.unique(values, return_inverse=True)
+        return levels, level_index.astype(np.min_scalar_type(len(levels)))
+
+    def _pair_index(self, wire):
+        """Basis states with `wire` set to 0, one per amplitude pair of a mixer group on that wire."""
+        return np.arange(2**self.num_nodes).reshape(2**wire, 2, -1)[:, 0, :].ravel()
+
+    def _mixer_groups(self, mixer_h):
+        """
+        Group consecutive mixer terms acting with X on the same wire.
+
+        For each group, the rotation angle of a pair of amplitudes is `alpha * sum_k c_k z_k(x)`,
+        where `z_k(x)` is the PauliZ eigenvalue of term k. These weights are stored as levels, since
+        the bit-flip mixer only produces a handful of distinct values.
+
+        Returns:
+            list: A list of `(wire, levels, level_index)` tuples.
+        """
+        groups = []
+        for coeff, word in self._pauli_words(mixer_h):
+            if word.count("X") != 1 or set(word) - {"I", "X", "Z"}:
+                raise ValueError(f"Mixer terms must have a single X and otherwise PauliZ/Identity, got {word}.")
+            wire = word.index("X")
+            if not groups or groups[-1][0] != wire:
+                groups.append((wire, []))
+            groups[-1][1].append((coeff, word))
+
+        mixer_groups = []
+        for wire, terms in groups:
+            index = self._pair_index(wire)
+            weights = np.zeros(len(index))
+            for coeff, word in terms:
+                weights += coeff * self._z_signs(word, index)
+            levels, level_index = self._levels(weights)
+            mixer_groups.append((wire, levels, level_index.reshape(2**wire, -1)))
+        return mixer_groups
+
+    def _angles(self, angle, levels):
+        """The table `angle * levels`, with one angle per statevector of a batch."""
+        return np.multiply.outer(angle, levels)
+
+    def _amplitude_blocks(self):
+        """Slices of the statevector of at most `CHUNK_AMPLITUDES` amplitudes."""
+        size = 2**self.num_nodes
+        return [slice(start, start + self.CHUNK_AMPLITUDES) for start in range(0, size, self.CHUNK_AMPLITUDES)]
+
+    def _pair_blocks(self, wire):
+        """Blocks of at most `CHUNK_AMPLITUDES` amplitude pairs of a mixer group, as (rows, columns) slices."""
+        rows, cols = 2**wire, 2 ** (self.num_nodes - 1 - wire)
+        row_step = max(1, self.CHUNK_AMPLITUDES // cols)
+        col_step = min(cols, self.CHUNK_AMPLITUDES)
+        return [
+            (slice(row, row + row_step), slice(col, col + col_step))
+            for row in range(0, rows, row_step)
+            for col in range(0, cols, col_step)
+        ]
+
+    def apply_cost_layer(self, state, gamma):
+        """Apply `exp(-i gamma H_C)` to `state` in place, with one gamma per statevector of a batch."""
+        phases = np.exp(-1j * self._angles(gamma, self.cost_levels)).astype(self.dtype)
+        for block in self._amplitude_blocks():
+            state[..., block] *= phases[..., self.cost_index[..., block]]
+
+    def apply_mixer_group(self, state, group, alpha):
+        """Apply the rotation of a single mixer group to `state` in place, with one alpha per statevector."""
+        wire, levels, level_index = group
+        angles = self._angles(alpha, levels)
+        cos_table = np.cos(angles).astype(self.real_dtype)
+        sin_table = (-1j * np.sin(angles)).astype(self.dtype)
+
+        # amplitudes with `wire` set to 0 and 1, paired up elementwise
+        pairs = state.reshape(state.shape[:-1] + (2**wire, 2, -1))
+        for rows, cols in self._pair_blocks(wire):
+            index = level_index[..., rows, cols]
+            cos, sin = cos_table[..., index], sin_table[..., index]
+            amps_0, amps_1 = pairs[..., rows, 0, cols], pairs[..., rows, 1, cols]
+            new_0 = cos * amps_0 + sin * amps_1
+            amps_1 *= cos
+            amps_1 += sin * amps_0
+            amps_0[...] = new_0
+
+    def apply_mixer_layer(self, state, alpha):
+        """Apply `exp(-i alpha H_M)`, one butterfly update per mixer group, to `state` in place."""
+        for group in self.mixer_groups:
+            self.apply_mixer_group(state, group, alpha)
+
+    def _mixer_overlap(self, bra, ket, group):
+        """Compute `<bra| G |ket>`, where G is the generator of a single mixer group."""
+        wire, levels, level_index = group
+        bra_pairs = bra.reshape(bra.shape[:-1] + (2**wire, 2, -1))
+        ket_pairs = ket.reshape(ket.shape[:-1] + (2**wire, 2, -1))
+        overlap = 0
+        for rows, cols in self._pair_blocks(wire):
+            flipped = np.conj(bra_pairs[..., rows, 0, cols]) * ket_pairs[..., rows, 1, cols]
+            flipped += np.conj(bra_pairs[..., rows, 1, cols]) * ket_pairs[..., rows, 0, cols]
+            overlap = overlap + np.sum(levels[level_index[..., rows, cols]] * flipped, axis=(-2, -1), dtype=complex)
+        return overlap
+
+    def _cost_overlap(self, bra, ket):
+        """Compute `<bra| H_C |ket>`, block by block."""
+        overlap = 0
+        for block in self._amplitude_blocks():
+            products = np.conj(bra[..., block]) * self.cost_diag[..., block] * ket[..., block]
+            overlap = overlap + np.sum(products, axis=-1, dtype=complex)
+        return overlap
+
+    def state(self, params):
+        """
+        Compute the final QAOA statevector.
+
+        Args:
+            params (array-like): Parameters of shape (..., 2, depth), the gamma and alpha values.
+
+        Returns:
+            numpy.ndarray: The statevector of length 2^n, or an array of shape (..., 2^n) for batched parameters.
+        """
+        params = np.asarray(params, dtype=float)
+        state = np.full(params.shape[:-2] + (2**self.num_nodes,), 2 ** (-self.num_nodes / 2), dtype=self.dtype)
+        for layer in range(params.shape[-1]):
+            self.apply_cost_layer(state, params[..., 0, layer])
+            self.apply_mixer_layer(state, params[..., 1, layer])
+        return state
+
+    def probs(self, params):
+        """Probabilities of all basis states, in the same order as `qml.probs`."""
+        return np.abs(self.state(params)) ** 2
+
+    def sample(self, params, shots, seed=None):
+        """
+        Sample basis states from the final QAOA statevector.
+
+        Args:
+            params (array-like): Parameters of shape (2, depth).
+            shots (int): The number of samples.
+            seed (int or numpy.random.Generator, optional): Seed of the sampler. Defaults to None.
+
+        Returns:
+            numpy.ndarray: The indices of the sampled basis states.
+        """
+        probs = self.probs(params).astype(float)
+        return np.random.default_rng(seed).choice(len(probs), size=shots, p=probs / probs.sum())
+
+    def sampled_expval(self, params, shots, seed=None):
+        """Estimate of the expectation value of the cost Hamiltonian from `shots` samples, see `sample`."""
+        return float(np.mean(self.cost_diag[self.sample(params, shots, seed)]))
+
+    def _chunks(self, params):
+        """Split batched parameters into chunks of about `BATCH_AMPLITUDES` amplitudes, or None if small enough."""
+        params = np.asarray(params, dtype=float)
+        batch = params.reshape((-1,) + params.shape[-2:])
+        size = max(1, self.BATCH_AMPLITUDES >> self.num_nodes)
+        if params.ndim == 2 or len(batch) <= size:
+            return None
+        return [batch[start : start + size] for start in range(0, len(batch), size)]
+
+    def expval(self, params):
+        """Expectation value of the cost Hamiltonian, or an array of them for batched parameters."""
+        chunks = self._chunks(params)
+        if chunks is not None:
+            return np.concatenate([self.expval(chunk) for chunk in chunks]).reshape(np.shape(params)[:-2])
+
+        state = self.state(params)
+        value = np.real(self._cost_overlap(state, state))
+        return float(value) if np.ndim(value) == 0 else value
+
+    def _active_pairs(self):
+        """
+        Amplitude pairs actually rotated by each mixer group, i.e. with a nonzero weight.
+
+        Returns:
+            list: A list of `(index_0, index_1, weights)` tuples, with the flat indices of the amplitudes with the X
+                wire set to 0 and 1.
+        """
+        active_pairs = []
+        for wire, levels, level_index in self.mixer_groups:
+            weights = levels[level_index].ravel()
+            active = np.flatnonzero(weights)
+            index_0 = self._pair_index(wire)[active]
+            active_pairs.append((index_0, index_0 + 2 ** (self.num_nodes - 1 - wire), weights[active]))
+        return active_pairs
+
+    def landscape(self, gammas, alphas):
+        """
+        Expectation value of the cost Hamiltonian at depth 1, over a whole grid of gammas and alphas.
+
+        After the cost layer, the state is `sum_l exp(-i gamma c_l) |phi_l>`, where `|phi_l>` is the uniform state
+        restricted to the basis states of cost level `c_l`. Each of the few `|phi_l>` is evolved by the mixer once
+        per alpha, which gives the matrix `M[l, l'] = <phi_l| U^dag H_C U |phi_l'>`. The expectation value of every
+        gamma is then the small quadratic form `sum_{l, l'} exp(i gamma (c_l - c_l')) M[l, l']`, so the cost of the
+        grid is `len(cost_levels) * len(alphas)` mixer layers instead of `len(gammas) * len(alphas)` circuits.
+
+        The mixer layers only update the amplitude pairs with a nonzero weight (for the bit-flip mixer, the nodes
+        whose neighbours are all unset), one statevector at a time so that it stays in the CPU cache.
+
+        Args:
+            gammas (array-like): Cost layer parameters.
+            alphas (array-like): Mixer layer parameters.
+
+        Returns:
+            numpy.ndarray: The expectation values, of shape (len(gammas), len(alphas)).
+        """
+        gammas = np.asarray(gammas, dtype=float)
+        alphas = np.asarray(alphas, dtype=float)
+        phases = np.exp(-1j * np.multiply.outer(gammas, self.cost_levels))
+        active_pairs = self._active_pairs()
+
+        level_states = np.zeros((len(self.cost_levels), 2**self.num_nodes), dtype=self.dtype)
+        level_states[self.cost_index, np.arange(2**self.num_nodes)] = 2 ** (-self.num_nodes / 2)
+
+        energies = np.empty((len(gammas), len(alphas)))
+        for j, alpha in enumerate(alphas):
+            rotations = [
+                (
+                    index_0,
+                    index_1,
+                    np.cos(alpha * weights).astype(self.real_dtype),
+                    (-1j * np.sin(alpha * weights)).astype(self.dtype),
+                )
+                for index_0, index_1, weights in active_pairs
+            ]
+            states = level_states.copy()
+            for state in states:
+                for index_0, index_1, cos, sin in rotations:
+                    amps_0, amps_1 = state[index_0], state[index_1]
+                    state[index_0] = cos * amps_0 + sin * amps_1
+                    state[index_1] = cos * amps_1 + sin * amps_0
+            overlaps = np.conj(states) @ (states * self.cost_diag).T
+            energies[:, j] = np.real(np.einsum("gl,lm,gm->g", np.conj(phases), overlaps, phases))
+        return energies
+
+    def gradient(self, params, diff_method="adjoint"):
+        """
+        Gradient of `expval` with respect to the QAOA parameters.
+
+        Args:
+            params (array-like): Parameters of shape (..., 2, depth).
+            diff_method (str, optional): One of ["adjoint", "finite-diff"]. Defaults to "adjoint".
+
+        Returns:
+            numpy.ndarray: The gradient, with the same shape as `params`.
+        """
+        return self.value_and_gradient(params, diff_method)[1]
+
+    def value_and_gradient(self, params, diff_method="adjoint"):
+        """
+        Expectation value of the cost Hamiltonian and its gradient.
+
+        Args:
+            params (array-like): Parameters of shape (..., 2, depth).
+            diff_method (str, optional): One of ["adjoint", "finite-diff"]. Defaults to "adjoint".
+
+        Returns:
+            tuple: The value of `expval` and the gradient, with the same shape as `params`.
+        """
+        chunks = self._chunks(params)
+        if chunks is not None:
+            results = [self.value_and_gradient(chunk, diff_method) for chunk in chunks]
+            values = np.concatenate([value for value, _ in results]).reshape(np.shape(params)[:-2])
+            return values, np.concatenate([grad for _, grad in results]).reshape(np.shape(params))
+
+        if diff_method == "adjoint":
+            return self.adjoint_gradient(params, return_value=True)
+        if diff_method == "finite-diff":
+            return self.expval(params), self.finite_diff_gradient(params)
+        raise ValueError(f"Unknown diff_method: {diff_method} given.")
+
+    def adjoint_gradient(self, params, return_value=False):
+        """
+        Gradient of `expval` using the adjoint method.
+
+        One forward pass computes the final state, then a single backward sweep un-applies every
+        layer to both the state and `H_C |psi>`, picking up `2 Im <lambda| G |phi>` for the generator G
+        of each layer on the way. The cost is about three circuit executions for any depth.
+
+        Args:
+            params (array-like): Parameters of shape (..., 2, depth).
+            return_value (bool, optional): Whether to also return the value of `expval`, which the forward
+                pass gives for free. Defaults to False.
+
+        Returns:
+            numpy.ndarray: The gradient, with the same shape as `params`. A `(value, gradient)` tuple if
+            `return_value` is True.
+        """
+        params = np.array(params, dtype=float)
+        gammas, alphas = params[..., 0, :], params[..., 1, :]
+        grad = np.zeros_like(params)
+
+        phi = self.state(params)
+        lam = self.cost_diag * phi
+        value = np.real(self._cost_overlap(phi, phi))
+        value = float(value) if np.ndim(value) == 0 else value
+
+        for layer in reversed(range(params.shape[-1])):
+            for group in reversed(self.mixer_groups):
+                grad[..., 1, layer] += 2 * np.imag(self._mixer_overlap(lam, phi, group))
+                self.apply_mixer_group(phi, group, -alphas[..., layer])
+                self.apply_mixer_group(lam, group, -alphas[..., layer])
+
+            grad[..., 0, layer] = 2 * np.imag(self._cost_overlap(lam, phi))
+            self.apply_cost_layer(phi, -gammas[..., layer])
+            self.apply_cost_layer(lam, -gammas[..., layer])
+
+        if return_value:
+            return value, grad
+        return grad
+
+    def finite_diff_gradient(self, params, eps=1e-6):
+        """
+        Gradient of `expval` using central finite differences.
+
+        Args:
+            params (array-like): Parameters of shape (..., 2, depth).
+            eps (float, optional): Finite difference step. Defaults to 1e-6.
+
+        Returns:
+            numpy.ndarray: The gradient, with the same shape as `params`.
+        """
+        params = np.array(params, dtype=float)
+        grad = np.zeros_like(params)
+        for idx in np.ndindex(params.shape[-2:]):
+            shifted = params.copy()
+            shifted[(...,) + idx] += eps
+            forward = self.expval(shifted)
+            shifted[(...,) + idx] -= 2 * eps
+            backward = self.expval(shifted)
+            grad[(...,) + idx] = (forward - backward) / (2 * eps)
+        return grad
+
+
+class MultiGraphQAOASimulator(DiagonalQAOASimulator):
+    """
+    A `DiagonalQAOASimulator` for several graphs with the same number of nodes, simulated together.
+
+    The cost diagonals of the G graphs are stacked into a (G, 2^n) array, and the weights of each mixer group into a
+    (G, 2^wire, 2^(n - 1 - wire)) array, both looked up from tables of levels shared by all graphs. The graphs are
+    the last batch dimension of the parameters: parameters of shape (..., G, 2, depth) give statevectors of shape
+    (..., G, 2^n), with the parameters of graph g applied to graph g, and expectation values of shape (..., G).
+    The layers are those of `DiagonalQAOASimulator`, with the per-graph tables of `_angles`. Batches are never
+    split into chunks.
+
+    The mixers must apply their groups to the same sequence of wires, e.g. the bit-flip mixers of graphs whose nodes
+    are all ordered `0..n - 1`.
+    """
+
+    def __init__(self, cost_hs, mixer_hs, num_nodes, dtype=np.complex128):
+        """
+        Initialize the simulator and precompute the stacked cost diagonals and mixer groups.
+
+        Args:
+            cost_hs (list): Cost Hamiltonian of each graph, see `DiagonalQAOASimulator`.
+            mixer_hs (list): Mixer Hamiltonian of each graph, see `DiagonalQAOASimulator`.
+            num_nodes (int): The number of qubits (wires `0..num_nodes - 1`) of every graph.
+            dtype (numpy.dtype, optional): Complex dtype of the statevectors. Defaults to np.complex128.
+        """
+        simulators = [
+            DiagonalQAOASimulator(cost_h, mixer_h, num_nodes, dtype) for cost_h, mixer_h in zip(cost_hs, mixer_hs)
+        ]
+        wires = [[wire for wire, _, _ in simulator.mixer_groups] for simulator in simulators]
+        if any(graph_wires != wires[0] for graph_wires in wires):
+            raise ValueError("The mixer groups of all graphs must act on the same sequence of wires.")
+
+        self.num_graphs = len(simulators)
+        self.num_nodes = num_nodes
+        self.hamiltonians = list(zip(cost_hs, mixer_hs))
+        self.wire_map = simulators[0].wire_map
+        self.dtype = simulators[0].dtype
+        self.real_dtype = simulators[0].real_dtype
+
+        self.cost_diag = np.stack([simulator.cost_diag for simulator in simulators])
+        self.cost_levels, self.cost_index = self._stacked_levels(self.cost_diag)
+        self.mixer_groups = []
+        for k, wire in enumerate(wires[0]):
+            groups = [simulator.mixer_groups[k] for simulator in simulators]
+            weights = np.stack([levels[level_index] for _, levels, level_index in groups])
+            self.mixer_groups.append((wire,) + self._stacked_levels(weights))
+
+    def _stacked_levels(self, values):
+        """
+        Split the stacked `values` of all graphs into a table of levels repeated for each graph, and an index into
+        the table of its own graph, so that one flat lookup gathers per-graph values for every graph at once.
+        """
+        levels, level_index = self._levels(values.ravel())
+        offsets = len(levels) * np.arange(self.num_graphs).reshape((-1,) + (1,) * (values.ndim - 1))
+        return np.tile(levels, self.num_graphs), (level_index.reshape(values.shape) + offsets).astype(np.int64)
+
+    def _angles(self, angle, levels):
+        """The table `angle * levels` of each graph, of shape (..., G * levels) for `angle` of shape (..., G)."""
+        angles = np.asarray(angle)[..., np.newaxis] * levels.reshape(self.num_graphs, -1)
+        return angles.reshape(angles.shape[:-2] + (-1,))
+
+    def _chunks(self, params):
+        return None
+
+    def landscape(self, gammas, alphas):
+        """
+        Depth 1 expectation values of every graph over a grid of gammas and alphas, see
+        `DiagonalQAOASimulator.landscape`. The level decomposition of the scan is per graph, so each graph is
+        scanned by its own `DiagonalQAOASimulator`, one at a time.
+
+        Args:
+            gammas (array-like): Cost layer parameters.
+            alphas (array-like): Mixer layer parameters.
+
+        Returns:
+            numpy.ndarray: The expectation values, of shape (len(gammas), len(alphas), G).
+        """
+        landscapes = [
+            DiagonalQAOASimulator(cost_h, mixer_h, self.num_nodes, self.dtype).landscape(gammas, alphas)
+            for cost_h, mixer_h in self.hamiltonians
+        ]
+        return np.stack(landscapes, axis=-1)
+
+
+def benchmark_gradients(num_nodes=12, depths=(1, 2, 4, 8), repeats=3):
+    """
+    Time one gradient evaluation for each diff_method at growing QAOA depths.
+
+    The adjoint time grows only with the circuit length, while finite differences also scale with the
+    number of parameters (2 * depth).
+
+    Args:
+        num_nodes (int, optional): Number of nodes of the square graph. Defaults to 12.
+        depths (tuple, optional): QAOA depths to benchmark. Defaults to (1, 2, 4, 8).
+        repeats (int, optional): Number of timed gradient evaluations per setting. Defaults to 3.
+
+    Returns:
+        list: A list of `(depth, diff_method, seconds per gradient)` tuples.
+    """
+    import sys
+    import time
+    from pennylane import qaoa
+
+    sys.path.append(".")
+    from utils.graph_utils import get_square_graph
+
+    graph, _ = get_square_graph(num_nodes)
+    cost_h, mixer_h = qaoa.cost.max_independent_set(graph)
+    simulator = DiagonalQAOASimulator(cost_h, mixer_h, num_nodes)
+
+    results = []
+    for depth in depths:
+        params = np.full((2, depth), 0.5)
+        for diff_method in ["adjoint", "finite-diff"]:
+            start = time.perf_counter()
+            for _ in range(repeats):
+                simulator.gradient(params, diff_method)
+            results.append((depth, diff_method, (time.perf_counter() - start) / repeats))
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'depth':>5} {'diff_method':>12} {'sec/grad':>10} {'sec/grad/layer':>15}")
+    for depth, diff_method, seconds in benchmark_gradients():
+        print(f"{depth:>5} {diff_method:>12} {seconds:>10.4f} {seconds / depth:>15.4f}")
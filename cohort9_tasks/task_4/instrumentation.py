@@ -0,0 +1,173 @@
+import contextlib
+import cProfile
+import functools
+import io
+import pstats
+import time
+import tracemalloc
+
+# shared by every disabled phase, so that instrumenting a hot path costs a single `with` statement
+_DISABLED = contextlib.nullcontext()
+
+
+class Instrumentation:
+    """
+    Timers and counters for the phases of the MIS solvers, with optional per-run profiling.
+
+    A phase is timed with `with instrumentation.phase("gradient"): ...`, which adds its wall time to
+    `timers["gradient"]` and increments `counters["gradient"]`. Solver entry points (e.g. `solve`) are runs, see
+    `run`, which can also be profiled with cProfile and traced with tracemalloc. A `callback` is called at the end
+    of every optimization step with the metrics of the step, whether or not the instrumentation is enabled.
+
+    When disabled, `phase` and `run` return a shared no-op context manager, so the instrumentation can be left in
+    the solvers' hot paths, and in production sweeps, at the cost of one `with` statement per phase.
+    """
+
+    def __init__(self, enabled=False, profile=False, trace_memory=False, callback=None):
+        """
+        Initialize the instrumentation.
+
+        Args:
+            enabled (bool, optional): Whether to time and count the phases. Defaults to False.
+            profile (bool, optional): Whether to profile every run with cProfile, see `profile_stats`. Only applies
+                when enabled. Defaults to False.
+            trace_memory (bool, optional): Whether to trace the Python allocations of every run with tracemalloc,
+                see `peak_memory_mb`. Only applies when enabled. Defaults to False.
+            callback (callable, optional): Called at the end of every optimization step with a dict of metrics: the
+                "solver", "step", "cost", "grad_norm" and "step_time". Defaults to None.
+        """
+        self.enabled = enabled
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        """Clear the timers, counters, profiles and memory peaks."""
+        self.timers = {}
+        self.counters = {}
+        self.peak_memory_mb = {}
+        self._profiles = {}
+        self._run_depth = 0
+
+    def count(self, name, increment=1):
+        """Increment the counter `name`, if enabled."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + increment
+
+    def phase(self, name):
+        """
+        Context manager timing and counting a phase.
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            A context manager, a shared no-op one when disabled.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timers[name] = self.timers.get(name, 0.0) + time.perf_counter() - start
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def run(self, name):
+        """
+        Context manager of a solver run, a phase that is also profiled and traced if requested.
+
+        Only the outermost run is profiled and traced, e.g. the `solve` of each depth of `solve_depth_ladder` is
+        timed, but the profile covers the whole ladder.
+
+        Args:
+            name (str): The name of the run, e.g. "solve".
+
+        Returns:
+            A context manager, a shared no-op one when disabled.
+        """
+        if not self.enabled:
+            return _DISABLED
+        return self._run(name)
+
+    @contextlib.contextmanager
+    def _run(self, name):
+        outermost = self._run_depth == 0
+        profiler = cProfile.Profile() if outermost and self.profile else None
+        tracing = outermost and self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+
+        self._run_depth += 1
+        try:
+            with self._timed(name):
+                yield
+        finally:
+            self._run_depth -= 1
+            if profiler is not None:
+                profiler.disable()
+                if name in self._profiles:
+                    self._profiles[name].add(profiler)
+                else:
+                    self._profiles[name] = pstats.Stats(profiler)
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1] / 2**20
+                tracemalloc.stop()
+                self.peak_memory_mb[name] = max(self.peak_memory_mb.get(name, 0.0), peak)
+
+    def end_step(self, solver, step, cost, grad_norm, step_time):
+        """Count an optimization step and call the `callback` with its metrics."""
+        self.count("steps")
+        if self.callback is not None:
+            self.callback(
+                {"solver": solver, "step": step, "cost": cost, "grad_norm": grad_norm, "step_time": step_time}
+            )
+
+    def profile_stats(self, name="solve"):
+        """The cProfile statistics accumulated over the runs `name`, a `pstats.Stats`, or None if not profiled."""
+        return self._profiles.get(name)
+
+    def report(self, top=10):
+        """
+        Summarize the instrumentation.
+
+        Args:
+            top (int, optional): Number of functions of each profile listed, by cumulative time. Defaults to 10.
+
+        Returns:
+            dict: The "timers" (in seconds) and "counters" of the phases, the tracemalloc "peak_memory_mb" of the
+                runs, and the text of the top functions of each run's "profiles".
+        """
+        profiles = {}
+        for name, stats in self._profiles.items():
+            stream = io.StringIO()
+            stats.stream = stream
+            stats.sort_stats("cumulative").print_stats(top)
+            profiles[name] = stream.getvalue()
+        return {
+            "timers": dict(self.timers),
+            "counters": dict(self.counters),
+            "peak_memory_mb": dict(self.peak_memory_mb),
+            "profiles": profiles,
+        }
+
+
+def instrumented(name):
+    """Decorate a solver method as an instrumented run `name`, see `Instrumentation.run`."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.run(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
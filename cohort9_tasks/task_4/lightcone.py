@@ -0,0 +1,255 @@
+import numpy as np
+import pennylane as qml
+
+
+def _sin2(gamma, coeff):
+    """`sin(2 gamma a)` and its derivative with respect to gamma."""
+    return np.sin(2 * gamma * coeff), 2 * coeff * np.cos(2 * gamma * coeff)
+
+
+def _cos2(gamma, coeff):
+    """`cos(2 gamma a)` and its derivative with respect to gamma."""
+    return np.cos(2 * gamma * coeff), -2 * coeff * np.sin(2 * gamma * coeff)
+
+
+def _cos_product(gamma, coeffs):
+    """`prod_k cos(2 gamma a_k)` and its derivative with respect to gamma, for `gamma` of any shape."""
+    if len(coeffs) == 0:
+        return np.ones(np.shape(gamma)), np.zeros(np.shape(gamma))
+    angles = 2 * np.multiply.outer(gamma, np.asarray(coeffs, dtype=float))
+    cos = np.cos(angles)
+
+    # product of all the other factors of each factor, from prefix and suffix products, without dividing by zero
+    ones = np.ones(np.shape(gamma) + (1,))
+    prefix = np.cumprod(np.concatenate([ones, cos[..., :-1]], axis=-1), axis=-1)
+    suffix = np.cumprod(np.concatenate([ones, cos[..., :0:-1]], axis=-1), axis=-1)[..., ::-1]
+    derivative = np.sum(-2 * np.asarray(coeffs) * np.sin(angles) * prefix * suffix, axis=-1)
+    return prefix[..., -1] * cos[..., -1], derivative
+
+
+def _product(*factors):
+    """Product of `(value, derivative)` pairs, with the product rule."""
+    value, derivative = factors[0]
+    for factor_value, factor_derivative in factors[1:]:
+        value, derivative = value * factor_value, derivative * factor_value + value * factor_derivative
+    return value, derivative
+
+
+def unconstrained_mis_hamiltonians(graph):
+    """
+    The cost and mixer Hamiltonians of `qaoa.cost.max_independent_set(graph, constrained=False)`, in linear time.
+
+    PennyLane builds these by simplifying a sum over all edges, which takes minutes beyond a few hundred nodes. The
+    same Ising Hamiltonian, `sum_u (1 - 3/4 deg(u)) Z_u + 3/4 sum_uv Z_u Z_v` with the X mixer, is built directly.
+
+    Args:
+        graph (nx.Graph): The graph.
+
+    Returns:
+        tuple: The cost and mixer Hamiltonians.
+    """
+    coeffs = [1 - 0.75 * graph.degree(node) for node in graph.nodes] + [0.75] * graph.number_of_edges()
+    ops = [qml.PauliZ(node) for node in graph.nodes] + [qml.PauliZ(u) @ qml.PauliZ(v) for u, v in graph.edges]
+    return qml.Hamiltonian(coeffs, ops), qml.qaoa.x_mixer(graph.nodes)
+
+
+class LightConeQAOAEvaluator:
+    """
+    Exact depth 1 QAOA expectation values of an Ising cost Hamiltonian with the X mixer, without any statevector.
+
+    For the cost `H_C = c + sum_u h_u Z_u + sum_uv J_uv Z_u Z_v` and the mixer `H_M = sum_u b_u X_u` (e.g. the
+    unconstrained `qaoa.cost.max_independent_set(graph, constrained=False)`), the state
+    `exp(-i alpha H_M) exp(-i gamma H_C) |+>^n` has the closed-form expectation values
+
+        <Z_u> = s_u sin(2 gamma h_u) prod_w cos(2 gamma J_uw)
+        <Z_u Z_v> = s_u c_v sin(2 gamma J_uv) cos(2 gamma h_u) prod_{w != v} cos(2 gamma J_uw)
+                  + c_u s_v sin(2 gamma J_uv) cos(2 gamma h_v) prod_{w != u} cos(2 gamma J_vw)
+                  + s_u s_v / 2 * [cos(2 gamma (h_u - h_v)) prod_w cos(2 gamma (J_uw - J_vw))
+                                   - cos(2 gamma (h_u + h_v)) prod_w cos(2 gamma (J_uw + J_vw))]
+
+    with `s_u = sin(2 alpha b_u)` and `c_u = cos(2 alpha b_u)`. Each term only depends on the coefficients of its
+    light cone, the term's nodes and their neighbors. Nodes and edges with the same coefficients in their light cone,
+    e.g. the nodes of the same degree and the edges with the same degrees and number of common neighbors of an
+    unweighted MIS, are isomorphic neighbourhood types with the same expectation value. Each type is evaluated once,
+    with its analytic gradient, and weighted by its number of terms, so an evaluation costs the number of types,
+    independent of the number of nodes.
+
+    The bit-flip mixer of the constrained formulation applies its non-commuting terms one after the other, which
+    widens the light cone of a term by a hop per term of its neighbors, so it is not supported. The methods mirror
+    `DiagonalQAOASimulator` for parameters of shape (..., 2, 1), without the ones needing a statevector.
+    """
+
+    def __init__(self, cost_h, mixer_h, num_nodes):
+        """
+        Initialize the evaluator and group the terms of the cost Hamiltonian by neighbourhood type.
+
+        Args:
+            cost_h (qml.Hamiltonian): Cost Hamiltonian, with terms of at most two PauliZ.
+            mixer_h (qml.Hamiltonian): Mixer Hamiltonian, each term a single PauliX.
+            num_nodes (int): The number of qubits (wires `0..num_nodes - 1`).
+        """
+        self.num_nodes = num_nodes
+        self.constant = 0.0
+        fields = np.zeros(num_nodes)
+        couplings = [{} for _ in range(num_nodes)]
+        for coeff, op in zip(cost_h.coeffs, cost_h.ops):
+            word = self._pauli_word(op)
+            wires = [wire for wire, pauli in zip(op.wires, word) if pauli != "I"]
+            if set(word) - {"I", "Z"} or len(wires) > 2:
+                raise ValueError(f"The cost Hamiltonian must be an Ising Hamiltonian, got term {word} on {op.wires}.")
+            if not wires:
+                self.constant += float(coeff)
+            elif len(wires) == 1:
+                fields[wires[0]] += float(coeff)
+            else:
+                u, v = wires
+                couplings[u][v] = couplings[v][u] = couplings[u].get(v, 0.0) + float(coeff)
+
+        mixer = np.zeros(num_nodes)
+        for coeff, op in zip(mixer_h.coeffs, mixer_h.ops):
+            word = self._pauli_word(op)
+            if word != "X":
+                raise ValueError(f"The light-cone evaluator needs the X mixer, got term {word} on {op.wires}.")
+            mixer[op.wires[0]] += float(coeff)
+
+        # the nodes of each node type, and the number of edges of each edge type
+        self.node_types = {}
+        for u in range(num_nodes):
+            key = (fields[u], mixer[u], tuple(sorted(couplings[u].values())))
+            self.node_types.setdefault(key, []).append(u)
+        self.edge_types = {}
+        for u in range(num_nodes):
+            for v, coupling in couplings[u].items():
+                if u < v and coupling != 0:
+                    # the same key whichever end of the edge comes first
+                    key = min(
+                        self._edge_key(u, v, fields, mixer, couplings), self._edge_key(v, u, fields, mixer, couplings)
+                    )
+                    self.edge_types[key] = self.edge_types.get(key, 0) + 1
+
+    @staticmethod
+    def _pauli_word(op):
+        """The Pauli string of `op` over its own wires."""
+        return qml.pauli.pauli_word_to_string(op, wire_map={wire: i for i, wire in enumerate(op.wires)})
+
+    @staticmethod
+    def _edge_key(u, v, fields, mixer, couplings):
+        """The coefficients of the light cone of the edge (u, v), with the couplings of u and v to each neighbor."""
+        neighbors = (set(couplings[u]) | set(couplings[v])) - {u, v}
+        pairs = sorted((couplings[u].get(w, 0.0), couplings[v].get(w, 0.0)) for w in neighbors)
+        return (couplings[u][v], fields[u], mixer[u], fields[v], mixer[v], tuple(pairs))
+
+    @property
+    def num_types(self):
+        """The number of distinct node and edge types, i.e. of closed-form terms per evaluation."""
+        return len(self.node_types) + len(self.edge_types)
+
+    def _angles(self, params):
+        """The gamma and alpha of depth 1 parameters of shape (..., 2, 1)."""
+        params = np.asarray(params, dtype=float)
+        if params.shape[-2:] != (2, 1):
+            raise ValueError(f"The light-cone evaluator only supports depth 1, got parameters of shape {params.shape}.")
+        return params[..., 0, 0], params[..., 1, 0]
+
+    def _node_expval(self, key, gamma, alpha):
+        """`<Z_u>` of a node type, and its derivatives with respect to gamma and alpha."""
+        field, mixer, couplings = key
+        value, d_gamma = _product(_sin2(gamma, field), _cos_product(gamma, couplings))
+        sin, d_alpha = np.sin(2 * alpha * mixer), 2 * mixer * np.cos(2 * alpha * mixer)
+        return sin * value, sin * d_gamma, d_alpha * value
+
+    def _edge_expval(self, key, gamma, alpha):
+        """`<Z_u Z_v>` of an edge type, and its derivatives with respect to gamma and alpha."""
+        coupling, field_u, mixer_u, field_v, mixer_v, pairs = key
+        couplings_u = [coupling_u for coupling_u, _ in pairs]
+        couplings_v = [coupling_v for _, coupling_v in pairs]
+
+        # the gamma dependence of <Y_u Z_v>, <Z_u Y_v> and <Y_u Y_v> after the cost layer
+        y_u = _product(_sin2(gamma, coupling), _cos2(gamma, field_u), _cos_product(gamma, couplings_u))
+        y_v = _product(_sin2(gamma, coupling), _cos2(gamma, field_v), _cos_product(gamma, couplings_v))
+        minus = _product(_cos2(gamma, field_u - field_v), _cos_product(gamma, np.subtract(couplings_u, couplings_v)))
+        plus = _product(_cos2(gamma, field_u + field_v), _cos_product(gamma, np.add(couplings_u, couplings_v)))
+        y_y = ((minus[0] - plus[0]) / 2, (minus[1] - plus[1]) / 2)
+
+        # the alpha dependence, from exp(i alpha b X) Z exp(-i alpha b X) = cos(2 alpha b) Z + sin(2 alpha b) Y
+        sin_u, cos_u = np.sin(2 * alpha * mixer_u), np.cos(2 * alpha * mixer_u)
+        sin_v, cos_v = np.sin(2 * alpha * mixer_v), np.cos(2 * alpha * mixer_v)
+        weights = [sin_u * cos_v, cos_u * sin_v, sin_u * sin_v]
+        d_weights = [
+            2 * mixer_u * cos_u * cos_v - 2 * mixer_v * sin_u * sin_v,
+            -2 * mixer_u * sin_u * sin_v + 2 * mixer_v * cos_u * cos_v,
+            2 * mixer_u * cos_u * sin_v + 2 * mixer_v * sin_u * cos_v,
+        ]
+        terms = [y_u, y_v, y_y]
+        value = sum(weight * term[0] for weight, term in zip(weights, terms))
+        d_gamma = sum(weight * term[1] for weight, term in zip(weights, terms))
+        d_alpha = sum(d_weight * term[0] for d_weight, term in zip(d_weights, terms))
+        return value, d_gamma, d_alpha
+
+    def value_and_gradient(self, params, diff_method="analytic"):
+        """
+        Expectation value of the cost Hamiltonian and its gradient.
+
+        Args:
+            params (array-like): Parameters of shape (..., 2, 1).
+            diff_method (str, optional): Only "analytic", the derivatives of the closed forms. Defaults to "analytic".
+
+        Returns:
+            tuple: The value of `expval` and the gradient, with the same shape as `params`.
+        """
+        if diff_method != "analytic":
+            raise ValueError(f"Unknown diff_method: {diff_method} given, the light-cone evaluator is analytic.")
+        gamma, alpha = self._angles(params)
+        value = np.full(np.shape(gamma), self.constant)
+        grad = np.zeros(np.shape(gamma) + (2, 1))
+        for key, nodes in self.node_types.items():
+            if key[0] == 0:
+                continue
+            expval, d_gamma, d_alpha = self._node_expval(key, gamma, alpha)
+            value = value + key[0] * len(nodes) * expval
+            grad[..., 0, 0] += key[0] * len(nodes) * d_gamma
+            grad[..., 1, 0] += key[0] * len(nodes) * d_alpha
+        for key, count in self.edge_types.items():
+            expval, d_gamma, d_alpha = self._edge_expval(key, gamma, alpha)
+            value = value + key[0] * count * expval
+            grad[..., 0, 0] += key[0] * count * d_gamma
+            grad[..., 1, 0] += key[0] * count * d_alpha
+        return (float(value) if np.ndim(value) == 0 else value), grad
+
+    def expval(self, params):
+        """Expectation value of the cost Hamiltonian, or an array of them for batched parameters."""
+        return self.value_and_gradient(params)[0]
+
+    def gradient(self, params, diff_method="analytic"):
+        """Gradient of `expval` with respect to the QAOA parameters, see `value_and_gradient`."""
+        return self.value_and_gradient(params, diff_method)[1]
+
+    def landscape(self, gammas, alphas):
+        """
+        Expectation value of the cost Hamiltonian over a whole grid of gammas and alphas.
+
+        Args:
+            gammas (array-like): Cost layer parameters.
+            alphas (array-like): Mixer layer parameters.
+
+        Returns:
+            numpy.ndarray: The expectation values, of shape (len(gammas), len(alphas)).
+        """
+        grid = np.stack(np.meshgrid(gammas, alphas, indexing="ij"), axis=-1)
+        return self.expval(grid[..., np.newaxis])
+
+    def marginals(self, params):
+        """
+        Probability of every qubit to be measured in |1>, i.e. `(1 - <Z_u>) / 2`.
+
+        Args:
+            params (array-like): Parameters of shape (2, 1).
+
+        Returns:
+            numpy.ndarray: The probabilities, of shape (num_nodes,).
+        """
+        gamma, alpha = self._angles(params)
+        probs = np.empty(self.num_nodes)
+        for key, nodes in self.node_types.items():
+            probs[nodes] = (1 - self._node_expval(key, gamma, alpha)[0]) / 2
+        return probs
@@ -1,9 +1,41 @@
+import multiprocessing
 import networkx as nx
-import matplotlib.pyplot as plt
+from .reduction import MISKernel
+from .partition import GraphPartition
+from .decoding import decode_counts, decode_mis
+from .instrumentation import Instrumentation, instrumented
+
+
+def map_components(function, tasks, workers=None):
+    """
+    Apply `function` to every task, across a process pool when there is more than one task.
+
+    Args:
+        function (callable): A picklable, module-level function.
+        tasks (list): The arguments, one per call.
+        workers (int, optional): Number of worker processes, None for one per CPU core and 1 to run
+            in this process. Defaults to None.
+
+    Returns:
+        list: The results, in the order of `tasks`.
+    """
+    if workers == 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    with multiprocessing.Pool(min(workers or multiprocessing.cpu_count(), len(tasks))) as pool:
+        return pool.map(function, tasks)
 
 
 class MISGraph:
-    def __init__(self):
+    def __init__(self, instrumentation=None):
+        """
+        Initialize the graph variables.
+
+        Args:
+            instrumentation (Instrumentation, optional): Timers, counters and profiling hooks of the solver, which
+                may be shared by several solvers to aggregate their phases. Defaults to None, for a disabled one.
+        """
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+
         # Graph variables
         self.num_nodes = None
         self.edge_probs = None
@@ -27,6 +59,68 @@ class MISGraph:
         # nx.graph to solve MIS with QAOA
         self.graph = nx.fast_gnp_random_graph(n=num_nodes, p=edge_probs, seed=seed)
 
+    def connected_components(self):
+        """Connected components of the graph, each a list of nodes in graph order, ordered by first node."""
+        order = {node: i for i, node in enumerate(self.graph.nodes)}
+        components = [sorted(component, key=order.get) for component in nx.connected_components(self.graph)]
+        return sorted(components, key=lambda component: order[component[0]])
+
+    def induced_subgraph(self, nodes):
+        """The subgraph induced by `nodes`, relabeled to nodes 0..k-1 iterated in the order of `nodes`."""
+        index = {node: i for i, node in enumerate(nodes)}
+        subgraph = nx.Graph()
+        subgraph.add_nodes_from(range(len(index)))
+        subgraph.add_edges_from((index[u], index[v]) for u, v in self.graph.subgraph(index).edges)
+        return subgraph
+
+    def kernelize(self, fold=True):
+        """
+        Reduce the graph to its MIS kernel, see `MISKernel`.
+
+        Args:
+            fold (bool, optional): Whether to apply degree-2 folding. Defaults to True.
+
+        Returns:
+            MISKernel: The kernel, whose `graph` has nodes 0..k-1 and whose `lift` maps kernel solutions back.
+        """
+        return MISKernel(self.graph, fold=fold)
+
+    def partition(self, max_qubits, overlap=1, seed=None):
+        """
+        Partition the graph into overlapping parts of at most `max_qubits` nodes, see `GraphPartition`.
+
+        Args:
+            max_qubits (int): The maximum number of nodes of a part.
+            overlap (int, optional): Number of hops of the halo around each part's core. Defaults to 1.
+            seed (int, optional): Seed of the min-cut bisections. Defaults to None.
+
+        Returns:
+            GraphPartition: The partition, whose `subgraphs` have nodes 0..k-1 and whose `reconcile` combines their
+                solutions.
+        """
+        return GraphPartition(self.graph, max_qubits, overlap, seed)
+
+    def stitch_bitstrings(self, components, bitstrings):
+        """
+        Combine the solutions of disjoint parts of the graph into a bitstring over the whole graph.
+
+        Since the MIS of a disjoint union is the union of the MIS's of its parts, the stitched bitstring
+        is a maximum independent set whenever the parts' bitstrings are.
+
+        Args:
+            components (list): Lists of nodes, e.g. from `connected_components`.
+            bitstrings (list): One bitstring per component, in the order of its nodes.
+
+        Returns:
+            str: The bitstring over all the nodes, in graph order. Nodes not in any component are "0".
+        """
+        position = {node: i for i, node in enumerate(self.graph.nodes)}
+        bits = ["0"] * len(position)
+        for component, bitstring in zip(components, bitstrings):
+            for node, bit in zip(component, bitstring):
+                bits[position[node]] = bit
+        return "".join(bits)
+
     def set_mis_nodes(self, nodes_bitstring):
         """Set the nodes belonging to the maximum independent set.
 
@@ -35,6 +129,42 @@ class MISGraph:
         """
         self.mis_nodes = "0" * (self.num_nodes - len(nodes_bitstring)) + nodes_bitstring
 
+    @instrumented("decode")
+    def decode_probs(self, probs, top_k=16, chunk_size=2**20):
+        """
+        Set the MIS nodes to the best independent set decoded from the most probable states, see `decode_mis`.
+
+        Unlike the most probable state itself, the decoded bitstring is always a maximal independent set.
+
+        Args:
+            probs (array-like or iterable): The probabilities of all basis states, or consecutive chunks of them.
+            top_k (int, optional): The number of most probable states decoded. Defaults to 16.
+            chunk_size (int, optional): Length of the chunks streamed over. Defaults to 2^20.
+
+        Returns:
+            dict: The result of `decode_mis`.
+        """
+        decoded = decode_mis(self.graph, probs, top_k, chunk_size)
+        self.set_mis_nodes(decoded["bitstring"])
+        return decoded
+
+    @instrumented("decode")
+    def decode_counts(self, counts, top_k=16):
+        """
+        Set the MIS nodes to the best independent set decoded from the most sampled bitstrings, see `decode_counts`.
+
+        Args:
+            counts (dict): The number of samples of each bitstring.
+            top_k (int, optional): The number of most sampled bitstrings decoded. Defaults to 16.
+
+        Returns:
+            dict: The result of `decode_counts`.
+        """
+        decoded = decode_counts(self.graph, counts, top_k)
+        self.set_mis_nodes(decoded["bitstring"])
+        return decoded
+
+    @instrumented("plot")
     def draw_graph(self, title=None, with_mis_nodes=False, plot_wait_time=None):
         """Draw the graph.
 
@@ -59,6 +189,8 @@ class MISGraph:
         else:
             color_map = ["lightblue" for _ in range(self.num_nodes)]
 
+        import matplotlib.pyplot as plt
+
         plt.figure()
         if title is not None:
             plt.title(title)
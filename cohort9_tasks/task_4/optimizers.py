@@ -0,0 +1,125 @@
+import pennylane as qml
+from pennylane import numpy as np
+from scipy.optimize import minimize
+
+# SciPy methods needing at most the gradient of the cost (not its Hessian), those using the gradient, and those
+# accepting a gradient norm tolerance
+SCIPY_METHODS = [
+    "Nelder-Mead", "Powell", "CG", "BFGS", "Newton-CG", "L-BFGS-B", "TNC", "COBYLA", "SLSQP", "trust-constr"
+]
+SCIPY_GRADIENT_METHODS = ["CG", "BFGS", "Newton-CG", "L-BFGS-B", "TNC", "SLSQP", "trust-constr"]
+SCIPY_GTOL_METHODS = ["CG", "BFGS", "L-BFGS-B", "TNC", "trust-constr"]
+
+
+class ScipyOptimizer:
+    """
+    A `scipy.optimize.minimize` method, driven from a single cost (and gradient) callback.
+
+    Unlike the PennyLane optimizers, SciPy runs its own loop, so `minimize` reports every iteration through a
+    callback instead of being stepped by `PennylaneMIS_QAOA.solve`, and stops with the method's own termination
+    criteria.
+    """
+
+    def __init__(self, method):
+        """
+        Initialize the optimizer.
+
+        Args:
+            method (str): A `scipy.optimize.minimize` method, e.g. "L-BFGS-B" or "COBYLA".
+        """
+        self.method = method
+
+    @property
+    def uses_gradient(self):
+        """Whether the method uses the gradient of the cost."""
+        return self.method in SCIPY_GRADIENT_METHODS
+
+    def minimize(self, value_and_grad, params, maxiter, cost_tol=None, grad_tol=None, callback=None):
+        """
+        Minimize the cost.
+
+        Args:
+            value_and_grad (callable): Function of the parameters returning the cost and its gradient, or only the cost
+                (with None for the gradient) when called with `with_grad=False`.
+            params (array-like): Initial parameters.
+            maxiter (int): Maximum number of iterations.
+            cost_tol (float, optional): Tolerance for termination (`tol` of `scipy.optimize.minimize`). Defaults to None.
+            grad_tol (float, optional): Gradient norm tolerance, for methods supporting it. Defaults to None.
+            callback (callable, optional): Called after every iteration with the iteration number, the parameters,
+                and the cost and gradient at the last evaluated point. Defaults to None.
+
+        Returns:
+            numpy.ndarray: The optimized parameters.
+        """
+        shape = np.shape(params)
+        last = {"cost": np.nan, "grad": None}
+
+        def fun(x):
+            cost, grad = value_and_grad(np.reshape(x, shape), with_grad=self.uses_gradient)
+            last["cost"], last["grad"] = float(cost), grad
+            if self.uses_gradient:
+                return last["cost"], np.ravel(grad)
+            return last["cost"]
+
+        iteration = [0]
+
+        def scipy_callback(x, *args):
+            # some methods call back once more after the last iteration
+            iteration[0] += 1
+            if callback is not None and iteration[0] <= maxiter:
+                callback(iteration[0], np.reshape(x, shape), last["cost"], last["grad"])
+
+        options = {"maxiter": maxiter}
+        if grad_tol is not None and self.method in SCIPY_GTOL_METHODS:
+            options["gtol"] = grad_tol
+
+        x0 = np.ravel(np.array(params, requires_grad=False))
+        result = minimize(
+            fun,
+            x0,
+            method=self.method,
+            jac=self.uses_gradient,
+            tol=cost_tol,
+            options=options,
+            callback=scipy_callback,
+        )
+        return np.reshape(result.x, shape)
+
+
+def get_optimizer(name, stepsize=0.01, steps=50):
+    """
+    Create an optimizer from its name.
+
+    Args:
+        name (str): One of ["gd", "adam", "nesterov", "spsa"], or a `scipy.optimize.minimize` method of
+            `SCIPY_METHODS` (e.g. "L-BFGS-B", "COBYLA"), case-insensitive.
+        stepsize (float, optional): The learning rate of the gradient-based PennyLane optimizers. Defaults to 0.01.
+        steps (int, optional): The number of steps, which sets the gain sequences of SPSA. Defaults to 50.
+
+    Returns:
+        qml.GradientDescentOptimizer, qml.SPSAOptimizer or ScipyOptimizer: The optimizer.
+    """
+    optimizers = {
+        "gd": lambda: qml.GradientDescentOptimizer(stepsize),
+        "adam": lambda: qml.AdamOptimizer(stepsize),
+        "nesterov": lambda: qml.NesterovMomentumOptimizer(stepsize),
+        "spsa": lambda: qml.SPSAOptimizer(maxiter=steps),
+    }
+    if name.lower() in optimizers:
+        return optimizers[name.lower()]()
+    # SciPy method names are case-insensitive
+    scipy_methods = {method.lower(): method for method in SCIPY_METHODS}
+    if name.lower() in scipy_methods:
+        return ScipyOptimizer(scipy_methods[name.lower()])
+    raise ValueError(f"Unknown optimizer: {name} given, expected one of {list(optimizers) + SCIPY_METHODS}.")
+
+
+def describe_optimizer(optimizer):
+    """A JSON-serializable description of an optimizer and its hyperparameters, e.g. for cache keys."""
+    if isinstance(optimizer, ScipyOptimizer):
+        return {"name": optimizer.method}
+    hyperparameters = ["stepsize", "momentum", "beta1", "beta2", "eps", "alpha", "gamma", "c", "A", "a"]
+    return {
+        "name": type(optimizer).__name__,
+        **{key: float(getattr(optimizer, key)) for key in hyperparameters if hasattr(optimizer, key)},
+    }
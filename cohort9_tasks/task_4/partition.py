@@ -0,0 +1,112 @@
+import numpy as np
+import networkx as nx
+from networkx.algorithms.community import kernighan_lin_bisection
+from .decoding import improve_by_swaps, repair_to_maximal
+
+
+class GraphPartition:
+    """
+    Partition a graph into overlapping parts that each fit a qubit budget, and reconcile the parts' solutions.
+
+    The graph is split into disjoint cores by recursive min-cut bisection: connected components first, then
+    Kernighan-Lin bisections of the components that are still too large. Each part is a core extended by a halo of
+    the vertices within `overlap` hops of it, so the solver of a part sees the neighborhood of its boundary vertices,
+    and the halo is trimmed to the budget by keeping the vertices with the most edges into the core.
+
+    Every vertex belongs to exactly one core, and takes its value from the solution of that core's part. The parts'
+    solutions can only conflict on the cut edges between cores, and `reconcile` repairs these conflicts, extends the
+    result to a maximal independent set of the whole graph and grows it with a local search across the boundaries.
+    """
+
+    def __init__(self, graph, max_qubits, overlap=1, seed=None):
+        """
+        Partition the graph.
+
+        Args:
+            graph (nx.Graph): The graph to partition.
+            max_qubits (int): The maximum number of vertices, i.e. qubits, of a part.
+            overlap (int, optional): Number of hops of the halo added around each core, 0 for disjoint parts.
+                Defaults to 1.
+            seed (int, optional): Seed of the Kernighan-Lin bisections. Defaults to None.
+        """
+        if max_qubits < 1:
+            raise ValueError(f"The qubit budget must be positive, {max_qubits} given.")
+        self.graph = graph
+        self.max_qubits = max_qubits
+        self.overlap = overlap
+        self.num_conflicts = None
+
+        # cores of at most half the budget always fit, with a trimmed halo
+        order = {node: i for i, node in enumerate(graph.nodes)}
+        min_core = max(1, max_qubits // 2) if overlap > 0 else max_qubits
+        self.cores = []
+        stack = [list(graph.nodes)] if len(graph) else []
+        while stack:
+            core = stack.pop()
+            if len(core) + len(self._halo(core)) <= max_qubits or len(core) <= min_core:
+                self.cores.append(core)
+                continue
+            subgraph = graph.subgraph(core)
+            if nx.is_connected(subgraph):
+                halves = kernighan_lin_bisection(subgraph, seed=seed)
+            else:
+                halves = nx.connected_components(subgraph)
+            stack += [sorted(half, key=order.get) for half in halves]
+        self.cores.sort(key=lambda core: order[core[0]])
+
+        # the parts, cores first, relabeled to nodes 0..k-1 for the solvers
+        self.parts = [core + self._halo(core)[: max_qubits - len(core)] for core in self.cores]
+        self.subgraphs = [self._relabeled_subgraph(part) for part in self.parts]
+
+    def _relabeled_subgraph(self, part):
+        """The subgraph induced by a part, with nodes 0..k-1 iterated in the order of the part."""
+        index = {node: i for i, node in enumerate(part)}
+        subgraph = nx.Graph()
+        subgraph.add_nodes_from(range(len(part)))
+        subgraph.add_edges_from((index[u], index[v]) for u, v in self.graph.subgraph(part).edges)
+        return subgraph
+
+    def _halo(self, core):
+        """The vertices within `overlap` hops of the core, nearest first, then by most edges into the core."""
+        core_set = set(core)
+        distances = {}
+        frontier = core_set
+        for hop in range(1, self.overlap + 1):
+            frontier = {
+                neighbor
+                for node in frontier
+                for neighbor in self.graph.neighbors(node)
+                if neighbor not in core_set and neighbor not in distances
+            }
+            distances.update((node, hop) for node in frontier)
+
+        order = {node: i for i, node in enumerate(self.graph.nodes)}
+        edges_into_core = {
+            node: sum(neighbor in core_set for neighbor in self.graph.neighbors(node)) for node in distances
+        }
+        return sorted(distances, key=lambda node: (distances[node], -edges_into_core[node], order[node]))
+
+    def reconcile(self, bitstrings):
+        """
+        Combine the solutions of the parts into an independent set of the whole graph.
+
+        Each vertex takes its bit from the part of its core. Cut edges with both vertices selected, counted in
+        `num_conflicts`, are repaired, and the set is extended to a maximal one, see `repair_to_maximal`. Since the
+        parts are solved without the vertices beyond their halo, the cores' boundaries are usually suboptimal, and
+        the set is then grown with `improve_by_swaps`.
+
+        Args:
+            bitstrings (list): One bitstring per part, in the order of its nodes (core first, then halo).
+
+        Returns:
+            str: The bitstring over all the nodes, in graph order.
+        """
+        position = {node: i for i, node in enumerate(self.graph.nodes)}
+        bits = np.zeros(len(position), dtype=np.uint8)
+        for core, bitstring in zip(self.cores, bitstrings):
+            for node, bit in zip(core, bitstring):
+                bits[position[node]] = int(bit)
+
+        self.num_conflicts = sum(int(bits[position[u]] and bits[position[v]]) for u, v in self.graph.edges if u != v)
+        repaired = repair_to_maximal(bits[np.newaxis], self.graph)[0]
+        return "".join(map(str, improve_by_swaps(repaired, self.graph)))
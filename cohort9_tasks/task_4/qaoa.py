@@ -1,13 +1,23 @@
-from datetime import datetime
-import pandas as pd
+import copy
+import functools
+import os
+import pickle
 import sys
+import time
+from collections import Counter
 from tqdm import tqdm
-import matplotlib.pyplot as plt
 
 sys.path.append(".")
 
-from .mis import MISGraph
+from .mis import MISGraph, map_components
+from .decoding import decode_marginals
+from .instrumentation import instrumented
+from .diag_simulator import DiagonalQAOASimulator, MultiGraphQAOASimulator
+from .lightcone import LightConeQAOAEvaluator, unconstrained_mis_hamiltonians
+from .optimizers import ScipyOptimizer, describe_optimizer, get_optimizer
+from .warm_start import WARM_STARTS
 from utils.graph_utils import get_square_graph
+from utils.log_utils import OptimizationLogger
 
 import networkx as nx
 import pennylane as qml
@@ -15,6 +25,85 @@ from pennylane import qaoa
 from pennylane import numpy as np
 
 
+PRECISIONS = {"double": np.complex128, "single": np.complex64}
+
+# the built-in engines, with the gradient method their "best" stands for
+ENGINE_DIFF_METHODS = {"numpy-diag": "adjoint", "lightcone": "analytic"}
+
+
+def create_device(device, num_wires, precision="double"):
+    """
+    Create a PennyLane device with the complex dtype of the given precision.
+
+    Args:
+        device (str): The PennyLane device name.
+        num_wires (int): The number of wires.
+        precision (str, optional): One of ["double", "single"]. Defaults to "double".
+
+    Returns:
+        qml.Device: The device.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision} given, expected one of {list(PRECISIONS)}.")
+    if precision == "double":
+        return qml.device(device, wires=num_wires)
+
+    # devices without a `c_dtype` option either reject it or silently keep complex128
+    try:
+        dev = qml.device(device, wires=num_wires, c_dtype=PRECISIONS[precision])
+    except TypeError:
+        dev = None
+    if getattr(dev, "C_DTYPE", None) != PRECISIONS[precision]:
+        raise ValueError(f"The {device} device does not support {precision} precision, use numpy-diag instead.")
+    return dev
+
+
+@functools.lru_cache(maxsize=None)
+def get_device(device, num_wires, precision="double"):
+    """
+    Get a PennyLane device, created once per process for each (device, num_wires, precision) triple.
+
+    Args:
+        device (str): The PennyLane device name.
+        num_wires (int): The number of wires.
+        precision (str, optional): One of ["double", "single"], see `create_device`. Defaults to "double".
+
+    Returns:
+        qml.Device: The shared device.
+    """
+    return create_device(device, num_wires, precision)
+
+
+def save_checkpoint(checkpoint_file, params, optimizer, step):
+    """
+    Save the state of an optimization, atomically replacing any previous checkpoint.
+
+    Args:
+        checkpoint_file (str): Path to the checkpoint.
+        params (array-like): The parameters after `step`.
+        optimizer (qml.GradientDescentOptimizer): The optimizer, with any internal state (e.g. momentum).
+        step (int): The number of steps done.
+    """
+    state = {"params": np.array(params, requires_grad=False), "optimizer": optimizer, "step": step}
+    with open(checkpoint_file + ".tmp", "wb") as f:
+        pickle.dump(state, f)
+    os.replace(checkpoint_file + ".tmp", checkpoint_file)
+
+
+def load_checkpoint(checkpoint_file):
+    """
+    Load a checkpoint saved by `save_checkpoint`.
+
+    Args:
+        checkpoint_file (str): Path to the checkpoint.
+
+    Returns:
+        dict: The "params", "optimizer" and "step" of the checkpoint.
+    """
+    with open(checkpoint_file, "rb") as f:
+        return pickle.load(f)
+
+
 class PennylaneMIS_QAOA(MISGraph):
     """
     A class for solving the Maximum Independent Set (MIS) problem using the Quantum Approximate Optimization Algorithm (QAOA) with PennyLane.
@@ -29,6 +118,10 @@ class PennylaneMIS_QAOA(MISGraph):
         num_nodes=None,
         graph=None,
         device="qulacs.simulator",
+        reuse_device=False,
+        precision="double",
+        instrumentation=None,
+        constrained=True,
     ):
         """
         Initialize the QAOA solver for the MIS problem.
@@ -36,7 +129,21 @@ class PennylaneMIS_QAOA(MISGraph):
         Args:
             num_nodes (int): The number of nodes in the graph.
             graph (networkx graph): The networkx graph to solve.
-            device (str, optional): The PennyLane device to be used for simulations. Defaults to "qulacs.simulator".
+            device (str, optional): The PennyLane device to be used for simulations, "numpy-diag" to use the
+                built-in `DiagonalQAOASimulator`, or "lightcone" to optimize depth 1 circuits with the
+                `LightConeQAOAEvaluator`, without any statevector (unconstrained only, see `decode_marginals`).
+                Defaults to "qulacs.simulator".
+            reuse_device (bool, optional): Whether to share the PennyLane device with other solvers of the same
+                size in this process (see `get_device`), instead of creating a new one. Defaults to False.
+            precision (str, optional): One of ["double", "single"]. Single precision stores the statevectors as
+                complex64, which halves the memory of large simulations at a relative accuracy of about 1e-6. Only
+                "numpy-diag" and the PennyLane devices accepting `c_dtype=np.complex64` support it. Defaults to
+                "double".
+            instrumentation (Instrumentation, optional): Timers, counters and profiling hooks, see `MISGraph`.
+                Defaults to None, for a disabled one.
+            constrained (bool, optional): Whether to use the constrained formulation of
+                `qaoa.cost.max_independent_set`, with the bit-flip mixer, or the unconstrained one, an Ising penalty
+                cost with the X mixer (see `unconstrained_mis_hamiltonians`). Defaults to True.
 
         Note: Only one of [num_nodes, graph] argument must be specified.
         """
@@ -45,7 +152,7 @@ class PennylaneMIS_QAOA(MISGraph):
         )
         assert condition, "Only one of [num_nodes, graph] argument must be specified."
 
-        super().__init__()
+        super().__init__(instrumentation)
 
         # Graph variables
         if num_nodes is not None:
@@ -58,12 +165,70 @@ class PennylaneMIS_QAOA(MISGraph):
 
         # QAOA variables
         ## Define the Hamiltonians and device based on the given graph
-        self.cost_h, self.mixer_h = qaoa.cost.max_independent_set(self.graph)
-        self.optimizer = qml.GradientDescentOptimizer()
+        self.constrained = constrained
+        with self.instrumentation.phase("hamiltonian"):
+            if constrained:
+                self.cost_h, self.mixer_h = qaoa.cost.max_independent_set(self.graph)
+            else:
+                self.cost_h, self.mixer_h = unconstrained_mis_hamiltonians(self.graph)
+        self._optimizer_template = qml.GradientDescentOptimizer()
+        self.optimizer = copy.deepcopy(self._optimizer_template)
 
-        ## Setting up the simulation device
+        ## Setting up the simulation device, created on first use
         self.device = device
-        self.dev = qml.device(self.device, wires=self.num_nodes)
+        self.reuse_device = reuse_device
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision} given, expected one of {list(PRECISIONS)}.")
+        self.precision = precision
+        self._dev = None
+        self._engine = None
+
+    @property
+    def dev(self):
+        """The PennyLane device, or None for the built-in engines."""
+        if self._dev is None and self.device not in ENGINE_DIFF_METHODS:
+            with self.instrumentation.phase("device"):
+                if self.reuse_device:
+                    self._dev = get_device(self.device, self.num_nodes, self.precision)
+                else:
+                    self._dev = create_device(self.device, self.num_nodes, self.precision)
+        return self._dev
+
+    @property
+    def engine(self):
+        """The `DiagonalQAOASimulator` for "numpy-diag", the `LightConeQAOAEvaluator` for "lightcone", or None."""
+        if self._engine is None and self.device == "numpy-diag":
+            with self.instrumentation.phase("engine"):
+                self._engine = DiagonalQAOASimulator(
+                    self.cost_h, self.mixer_h, self.num_nodes, dtype=PRECISIONS[self.precision]
+                )
+        elif self._engine is None and self.device == "lightcone":
+            with self.instrumentation.phase("engine"):
+                self._engine = LightConeQAOAEvaluator(self.cost_h, self.mixer_h, self.num_nodes)
+        return self._engine
+
+    def _check_diff_method(self, diff_method):
+        """Reject "adjoint" on PennyLane devices, whose adjoint method does not support the Hamiltonian expval."""
+        if diff_method == "adjoint" and self.device not in ENGINE_DIFF_METHODS:
+            raise ValueError(
+                f"The {self.device} device does not support diff_method='adjoint' for the cost Hamiltonian, use "
+                "'parameter-shift' or 'backprop', or the adjoint gradient of numpy-diag."
+            )
+
+    def _set_optimizer(self, optimizer, stepsize, steps):
+        """
+        Set `self.optimizer` to a fresh optimizer, from a name, an instance or, for None, the last one given.
+
+        Instances are kept as a template and copied for every optimization, so the state of stateful optimizers
+        (e.g. the moments of Adam) never carries over to the next one, whose parameters may have another shape.
+        """
+        if isinstance(optimizer, str):
+            optimizer = get_optimizer(optimizer, stepsize, steps)
+        if optimizer is not None:
+            self._optimizer_template = copy.deepcopy(optimizer)
+            if hasattr(self._optimizer_template, "reset"):
+                self._optimizer_template.reset()
+        self.optimizer = copy.deepcopy(self._optimizer_template)
 
     def qaoa_layer(self, gamma, alpha):
         """
@@ -87,32 +252,92 @@ class PennylaneMIS_QAOA(MISGraph):
             qml.Hadamard(wires=wire)
         qml.layer(self.qaoa_layer, self.qaoa_layer_depth, params[0], params[1])
 
+    @instrumented("solve")
     def solve(
         self,
-        qaoa_layer_params=[0.5, 0.5, 0.5, 0.5],
+        qaoa_layer_params=None,
         qaoa_layer_depth=2,
         steps=50,
         logs_file=None,
+        diff_method="best",
+        log_flush_every=100,
+        cache=None,
+        checkpoint_file=None,
+        checkpoint_every=10,
+        resume_from=None,
+        optimizer=None,
+        stepsize=0.01,
+        cost_tol=None,
+        grad_tol=None,
+        shots=None,
     ):
         """
         Solve the MIS problem using the QAOA algorithm.
 
         Args:
-            qaoa_layer_params (list or array-like, optional): Initial parameters for the QAOA layers. Defaults to [0.5, 0.5, 0.5, 0.5].
+            qaoa_layer_params (list or array-like, optional): Initial parameters for the QAOA layers, the
+                `qaoa_layer_depth` gamma values followed by the `qaoa_layer_depth` alpha values. Defaults to 0.5 for all.
             qaoa_layer_depth (int, optional): Depth of the QAOA layers. Defaults to 2.
             steps (int, optional): Number of optimization steps. Defaults to 50.
-            logs_file (str, optional): Path to a file where the optimization logs will be saved. Defaults to None.
+            logs_file (str, optional): Path to a file where the optimization logs will be saved, as CSV, or in
+                a compact binary format if it ends with ".bin" (see `utils.log_utils`). Each step records the
+                parameters after the step, and the cost, gradient norm and wall time of the step. Defaults to None.
+            diff_method (str, optional): Gradient method. For PennyLane devices, any QNode `diff_method` but "adjoint",
+                which does not support the cost Hamiltonian (e.g. "parameter-shift", "backprop"). For "numpy-diag",
+                one of ["adjoint", "finite-diff"], where "best" means "adjoint". "lightcone" is always "analytic".
+                Defaults to "best".
+            log_flush_every (int, optional): Number of steps buffered before appending them to `logs_file`.
+                Defaults to 100.
+            cache (ResultCache, optional): A cache of results (see `utils.cache_utils`). The optimized parameters
+                are looked up for this graph and the same solver parameters, and the optimization is skipped on a hit.
+                Otherwise, the optimized parameters, final cost, most probable bitstrings and solve time are stored.
+                Defaults to None.
+            checkpoint_file (str, optional): Path to a file where the parameters, optimizer and step counter are
+                saved every `checkpoint_every` steps and at the end of the optimization. Defaults to None.
+            checkpoint_every (int, optional): Number of steps between checkpoints. Defaults to 10.
+            resume_from (str, optional): Path to a checkpoint to resume the optimization from, running the
+                remaining steps up to `steps` and appending to `logs_file`. The optimization starts from scratch if
+                the file does not exist yet, so a preempted job can be rerun with `resume_from=checkpoint_file`.
+                Steps logged after the last checkpoint are logged again. Defaults to None.
+            optimizer (str or optimizer, optional): One of ["gd", "adam", "nesterov", "spsa"], any
+                `scipy.optimize.minimize` method (e.g. "L-BFGS-B", "COBYLA"), or an optimizer instance (see
+                `optimizers.get_optimizer`), copied afresh for every optimization. Defaults to None, for a fresh copy of
+                the last one given (gradient descent).
+            stepsize (float, optional): Learning rate of the gradient-based PennyLane optimizers given by name.
+                Defaults to 0.01.
+            cost_tol (float, optional): Stop early once the cost changes by less than `cost_tol` in a step. For SciPy,
+                the `tol` of the method. Defaults to None.
+            grad_tol (float, optional): Stop early once the gradient norm is below `grad_tol`. For SciPy, the `gtol`
+                of the methods supporting it. Defaults to None.
+            shots (int, optional): Number of shots from which the cost is estimated, as on hardware, instead of the
+                exact expectation value. PennyLane devices then differentiate the estimate (e.g. with the parameter
+                shift rule), while "numpy-diag" needs a gradient-free optimizer ("spsa" or e.g. "COBYLA").
+                Defaults to None, for the exact expectation value.
         """
 
         # Sanity checks
         assert self.cost_h is not None, "Cost Hamiltonian is not defined."
         assert self.mixer_h is not None, "Mixer Hamiltonian is not defined."
 
+        if qaoa_layer_params is None:
+            qaoa_layer_params = [0.5] * (2 * qaoa_layer_depth)
+        assert (
+            np.size(qaoa_layer_params) == 2 * qaoa_layer_depth
+        ), f"Expected {2 * qaoa_layer_depth} QAOA layer params for depth {qaoa_layer_depth}, got {np.size(qaoa_layer_params)}."
+
         self.qaoa_layer_depth = qaoa_layer_depth
         self.steps = steps
+        self._check_diff_method(diff_method)
+        self._set_optimizer(optimizer, stepsize, steps)
+        gradient_free = isinstance(self.optimizer, qml.SPSAOptimizer) or (
+            isinstance(self.optimizer, ScipyOptimizer) and not self.optimizer.uses_gradient
+        )
+        if shots is not None and self.device == "lightcone":
+            raise ValueError("The lightcone device has no statevector to estimate the cost from shots.")
+        if shots is not None and self.engine is not None and not gradient_free:
+            raise ValueError("Estimating the cost from shots on numpy-diag needs a gradient-free optimizer.")
 
-        @qml.qnode(self.dev)
-        def cost_function(params):
+        def circuit_cost(params):
             """
             Cost function for the optimization problem.
 
@@ -125,21 +350,664 @@ class PennylaneMIS_QAOA(MISGraph):
             self.circuit(params)
             return qml.expval(self.cost_h)
 
+        if self.engine is None:
+            with self.instrumentation.phase("qnode"):
+                cost_function = qml.qnode(self.dev, diff_method=diff_method)(circuit_cost)
+            if shots is not None:
+                cost_function = functools.partial(cost_function, shots=shots)
+            grad_fn = None
+        elif shots is not None:
+            cost_function = functools.partial(self.engine.sampled_expval, shots=shots)
+            grad_fn = None
+        else:
+            engine_diff_method = ENGINE_DIFF_METHODS[self.device] if diff_method == "best" else diff_method
+            cost_function = self.engine.expval
+
+            def grad_fn(params):
+                # like `qml.grad`, expose the cost of the forward pass to the optimizer
+                grad_fn.forward, grad = self.engine.value_and_gradient(params, engine_diff_method)
+                return grad
+
+        self.cost_function = cost_function
+
         # Initialize parameters
-        self.params = np.reshape(qaoa_layer_params, (2, 2), requires_grad=True)
+        self.params = np.reshape(qaoa_layer_params, (2, qaoa_layer_depth), requires_grad=True)
         params = self.params
 
+        # Look up the optimized parameters in the cache
+        if cache is not None:
+            # bitstrings are in wire order, i.e. sorted node labels. The mixer layer applies its non-commuting terms
+            # in wire order, so the circuit depends on the labeling and results are not shared by isomorphic graphs.
+            wire_graph = nx.Graph()
+            wire_graph.add_nodes_from(sorted(self.graph.nodes))
+            wire_graph.add_edges_from(self.graph.edges)
+            cache_params = {
+                "solver": "qaoa",
+                "qaoa_layer_params": params.flatten().tolist(),
+                "qaoa_layer_depth": qaoa_layer_depth,
+                "steps": steps,
+                "device": self.device,
+                "precision": self.precision,
+                "diff_method": diff_method,
+                "optimizer": describe_optimizer(self.optimizer),
+                "cost_tol": cost_tol,
+                "grad_tol": grad_tol,
+                "shots": shots,
+            }
+            with self.instrumentation.phase("cache"):
+                result = cache.get(wire_graph, cache_params, isomorphic=False)
+            if result is not None:
+                print("Loaded the optimized QAOA parameters from the cache.")
+                self.params = np.reshape(result["params"], (2, qaoa_layer_depth), requires_grad=True)
+                self.num_steps = 0
+                return
+        solve_start = time.perf_counter()
+
+        # Resume from a checkpoint
+        first_step = 1
+        resume = resume_from is not None and os.path.exists(resume_from)
+        if resume:
+            checkpoint = load_checkpoint(resume_from)
+            assert checkpoint["params"].shape == params.shape, (
+                f"Checkpoint {resume_from} has params of shape {checkpoint['params'].shape}, expected {params.shape}."
+            )
+            params = self.params = np.array(checkpoint["params"], requires_grad=True)
+            self.optimizer = checkpoint["optimizer"]
+            first_step = checkpoint["step"] + 1
+            print(f"Resuming the optimization from step {checkpoint['step']} of {resume_from}.")
+
         # Solve and save optimization logs
-        df = pd.DataFrame({"Timestamp": [], "Step": [], 0: [], 1: [], 2: [], 3: []})
-        df.loc[len(df.index)] = [datetime.now(), 0] + params.flatten().tolist()
+        logger = None
+        if logs_file is not None:
+            columns = ["Timestamp", "Step", "Cost", "GradNorm", "StepTime"] + list(range(2 * qaoa_layer_depth))
+            logger = OptimizationLogger(logs_file, columns, flush_every=log_flush_every, append=resume)
+            if not resume:
+                logger.log([time.time(), 0, np.nan, np.nan, np.nan] + params.flatten().tolist())
 
-        for i in tqdm(range(1, self.steps + 1)):
-            params = self.optimizer.step(cost_function, params)
+        def end_step(step, params, cost, grad, start):
+            """Log and checkpoint a step of any optimizer. Returns whether the optimization converged."""
             self.params = params
+            self.num_steps = step
+            cost = np.nan if cost is None else float(cost)
+            grad_norm = np.nan if grad is None else float(np.linalg.norm(grad))
+            step_time = time.perf_counter() - start
+            if logger is not None:
+                with self.instrumentation.phase("logging"):
+                    logger.log([time.time(), step, cost, grad_norm, step_time] + params.flatten().tolist())
+            self.instrumentation.end_step("qaoa", step, cost, grad_norm, step_time)
+
+            converged = (grad_tol is not None and grad_norm < grad_tol) or (
+                cost_tol is not None and abs(cost - end_step.previous_cost) < cost_tol
+            )
+            end_step.previous_cost = cost
+
+            if checkpoint_file is not None and (step % checkpoint_every == 0 or step == self.steps or converged):
+                with self.instrumentation.phase("checkpoint"):
+                    if logger is not None:
+                        # keep the logs up to date with the checkpoint
+                        logger.flush()
+                    save_checkpoint(checkpoint_file, params, self.optimizer, step)
+            return converged
+
+        end_step.previous_cost = np.nan
+        self.num_steps = first_step - 1
+
+        try:
+            if isinstance(self.optimizer, ScipyOptimizer):
+
+                def value_and_grad(params, with_grad=True):
+                    if not with_grad:
+                        with self.instrumentation.phase("cost"):
+                            return cost_function(params), None
+                    with self.instrumentation.phase("gradient"):
+                        if grad_fn is None:
+                            grad_function = qml.grad(cost_function)
+                            grad = grad_function(params)
+                            return grad_function.forward, grad
+                        grad = grad_fn(params)
+                        return grad_fn.forward, grad
+
+                start = [time.perf_counter()]
+
+                def callback(iteration, params, cost, grad):
+                    # SciPy stops with its own criteria, from `cost_tol` and `grad_tol`
+                    end_step(first_step + iteration - 1, params, cost, grad, start[0])
+                    start[0] = time.perf_counter()
+
+                params = self.optimizer.minimize(
+                    value_and_grad, params, self.steps - first_step + 1, cost_tol, grad_tol, callback
+                )
+                self.params = np.array(params, requires_grad=True)
+            else:
+                for i in tqdm(range(first_step, self.steps + 1), initial=first_step - 1, total=self.steps):
+                    start = time.perf_counter()
+                    if isinstance(self.optimizer, qml.SPSAOptimizer):
+                        # SPSA estimates the gradient from two evaluations, and has its own step counter
+                        cost = None
+                        if logger is not None or cost_tol is not None or self.instrumentation.callback is not None:
+                            with self.instrumentation.phase("cost"):
+                                cost = cost_function(params)
+                        with self.instrumentation.phase("gradient"):
+                            grad = self.optimizer.compute_grad(lambda p: np.array(cost_function(p)), (params,), {})
+                        with self.instrumentation.phase("update"):
+                            params = self.optimizer.apply_grad(grad, (params,))[0]
+                        self.optimizer.k += 1
+                    else:
+                        with self.instrumentation.phase("gradient"):
+                            grad, cost = self.optimizer.compute_grad(cost_function, (params,), {}, grad_fn=grad_fn)
+                        with self.instrumentation.phase("update"):
+                            params = self.optimizer.apply_grad(grad, (params,))[0]
+                    if end_step(i, params, cost, grad[0], start):
+                        print(f"Converged after {i} steps.")
+                        break
+        finally:
+            if logger is not None:
+                logger.close()
+
+        if cache is not None:
+            solve_time = time.perf_counter() - solve_start
+            bitstrings = {}  # "lightcone" has no statevector
+            if self.device != "lightcone":
+                probs = self.get_probs(False)
+                top = np.argsort(probs)[::-1][:16]
+                bitstrings = {format(int(i), f"0{self.num_nodes}b"): float(probs[i]) for i in top}
+            result = {
+                "params": self.params.flatten().tolist(),
+                "cost": float(cost_function(self.params)),
+                "bitstrings": bitstrings,
+                "solve_time": solve_time,
+            }
+            with self.instrumentation.phase("cache"):
+                cache.put(wire_graph, cache_params, result, isomorphic=False)
+
+    @instrumented("ladder")
+    def solve_depth_ladder(
+        self,
+        max_depth=4,
+        qaoa_layer_params=None,
+        steps=50,
+        warm_start="interp",
+        logs_file=None,
+        diff_method="best",
+        log_flush_every=100,
+        cache=None,
+        **solve_kwargs,
+    ):
+        """
+        Solve the MIS problem at depths 1, 2, ..., `max_depth`, warm-starting each depth from the previous optimum.
+
+        Args:
+            max_depth (int, optional): The final depth of the QAOA layers. Defaults to 4.
+            qaoa_layer_params (list or array-like, optional): Initial [gamma, alpha] for depth 1. Defaults to [0.5, 0.5].
+            steps (int, optional): Number of optimization steps at each depth. Defaults to 50.
+            warm_start (str, optional): One of ["interp", "fourier"], the heuristic extending depth p parameters
+                to depth p+1. Defaults to "interp".
+            logs_file (str, optional): Path to a file where the optimization logs will be saved, with a "_p<depth>"
+                suffix added for each depth. Defaults to None.
+            diff_method (str, optional): Gradient method, see `solve`. Defaults to "best".
+            log_flush_every (int, optional): Number of steps buffered before appending them to the logs. Defaults to 100.
+            cache (ResultCache, optional): A cache of results for every depth, see `solve`. Defaults to None.
+            **solve_kwargs: Other keyword arguments passed to `solve` at every depth, e.g. the optimizer,
+                given by name or as an instance, which is created afresh at every depth.
+
+        Returns:
+            list: A list of dicts with the "depth", optimized "params" and final "cost" of each depth.
+        """
+        assert warm_start in WARM_STARTS, f"Unknown warm_start: {warm_start} given."
+
+        params = qaoa_layer_params
+        history = []
+        for depth in range(1, max_depth + 1):
+            if depth > 1:
+                params = WARM_STARTS[warm_start](self.params)
+
+            depth_logs_file = None
             if logs_file is not None:
-                df.loc[len(df.index)] = [datetime.now(), i] + params.flatten().tolist()
-                df.to_csv(logs_file)
+                root, ext = os.path.splitext(logs_file)
+                depth_logs_file = f"{root}_p{depth}{ext}"
+
+            self.solve(
+                qaoa_layer_params=params,
+                qaoa_layer_depth=depth,
+                steps=steps,
+                logs_file=depth_logs_file,
+                diff_method=diff_method,
+                log_flush_every=log_flush_every,
+                cache=cache,
+                **solve_kwargs,
+            )
+            history.append(
+                {"depth": depth, "params": self.params, "cost": float(self.cost_function(self.params))}
+            )
+        return history
+
+    @instrumented("multistart")
+    def solve_multistart(
+        self,
+        num_starts=8,
+        qaoa_layer_depth=2,
+        steps=50,
+        qaoa_layer_params=None,
+        seed=None,
+        logs_file=None,
+        diff_method="best",
+        log_flush_every=100,
+        optimizer=None,
+        stepsize=0.01,
+        cost_tol=None,
+        grad_tol=None,
+    ):
+        """
+        Optimize several initial parameter sets together, and keep the best one.
+
+        All the starts are stepped as a single batch of shape (num_starts, 2, depth) by the optimizer. With
+        "numpy-diag", the batch is simulated at once by `DiagonalQAOASimulator`, sharing its precomputed cost
+        diagonal and mixer groups, so K starts cost much less than K single starts on small graphs, and "lightcone"
+        evaluates the batch in closed form. PennyLane devices evaluate the starts one by one with a single QNode.
+
+        Args:
+            num_starts (int, optional): Number of starts K. Defaults to 8.
+            qaoa_layer_depth (int, optional): Depth of the QAOA layers. Defaults to 2.
+            steps (int, optional): Maximum number of optimization steps. Defaults to 50.
+            qaoa_layer_params (array-like, optional): Initial parameters of shape (K, 2 * depth), the gammas then the
+                alphas of each start. Defaults to None, for the default parameters of `solve` (0.5 for all) followed by
+                K - 1 starts drawn uniformly in [0, pi).
+            seed (int, optional): Seed of the random starts. Defaults to None.
+            logs_file (str, optional): Path to a file where the optimization logs will be saved, see `solve`. Each
+                step records the start with the lowest cost, in a "Start" column. Defaults to None.
+            diff_method (str, optional): Gradient method, see `solve`. Defaults to "best".
+            log_flush_every (int, optional): Number of steps buffered before appending them to the logs. Defaults to 100.
+            optimizer (str or optimizer, optional): One of ["gd", "adam", "nesterov"], or an instance of a PennyLane
+                gradient-based optimizer, see `solve`. Defaults to None, for a fresh copy of the last one given.
+            stepsize (float, optional): Learning rate of the optimizers given by name. Defaults to 0.01.
+            cost_tol (float, optional): Stop early once the cost of every start changes by less than `cost_tol` in a
+                step. Defaults to None.
+            grad_tol (float, optional): Stop early once the gradient norm of every start is below `grad_tol`.
+                Defaults to None.
+
+        Returns:
+            numpy.ndarray: The final cost of each start. The parameters of the best start are kept in `self.params`.
+        """
+        self._check_diff_method(diff_method)
+        self._set_optimizer(optimizer, stepsize, steps)
+        if isinstance(self.optimizer, (ScipyOptimizer, qml.SPSAOptimizer)):
+            raise ValueError(f"Multi-start needs a gradient-based PennyLane optimizer, got {self.optimizer}.")
+
+        if qaoa_layer_params is None:
+            rng = np.random.default_rng(seed)
+            qaoa_layer_params = np.concatenate(
+                [np.full((1, 2 * qaoa_layer_depth), 0.5), rng.uniform(0, np.pi, (num_starts - 1, 2 * qaoa_layer_depth))]
+            )
+        assert np.shape(qaoa_layer_params) == (num_starts, 2 * qaoa_layer_depth), (
+            f"Expected QAOA layer params of shape {(num_starts, 2 * qaoa_layer_depth)}, "
+            f"got {np.shape(qaoa_layer_params)}."
+        )
+        self.qaoa_layer_depth = qaoa_layer_depth
+        self.steps = steps
+        params = np.reshape(qaoa_layer_params, (num_starts, 2, qaoa_layer_depth), requires_grad=True)
+
+        if self.engine is None:
+
+            def circuit_cost(params):
+                self.circuit(params)
+                return qml.expval(self.cost_h)
+
+            self.cost_function = qml.qnode(self.dev, diff_method=diff_method)(circuit_cost)
+            grad_function = qml.grad(self.cost_function)
+
+            def batch_cost(params):
+                return np.array([self.cost_function(start_params) for start_params in params])
+
+            def grad_fn(params):
+                grads, costs = [], []
+                for start_params in params:
+                    grads.append(grad_function(start_params))
+                    costs.append(grad_function.forward)
+                grad_fn.forward = np.array(costs)
+                return np.array(grads)
+
+        else:
+            engine_diff_method = ENGINE_DIFF_METHODS[self.device] if diff_method == "best" else diff_method
+            self.cost_function = batch_cost = self.engine.expval
+
+            def grad_fn(params):
+                grad_fn.forward, grad = self.engine.value_and_gradient(params, engine_diff_method)
+                return grad
+
+        logger = None
+        if logs_file is not None:
+            columns = ["Timestamp", "Step", "Start", "Cost", "GradNorm", "StepTime"]
+            logger = OptimizationLogger(logs_file, columns + list(range(2 * qaoa_layer_depth)), log_flush_every)
 
+        previous_costs = np.full(num_starts, np.nan)
+        self.num_steps = 0
+        try:
+            for i in tqdm(range(1, steps + 1)):
+                start = time.perf_counter()
+                with self.instrumentation.phase("gradient"):
+                    grad, costs = self.optimizer.compute_grad(batch_cost, (params,), {}, grad_fn=grad_fn)
+                with self.instrumentation.phase("update"):
+                    params = self.optimizer.apply_grad(grad, (params,))[0]
+                self.num_steps = i
+
+                grad_norms = np.linalg.norm(np.reshape(grad[0], (num_starts, -1)), axis=1)
+                best = int(np.argmin(costs))
+                step_time = time.perf_counter() - start
+                if logger is not None:
+                    with self.instrumentation.phase("logging"):
+                        row = [time.time(), i, best, float(costs[best]), float(grad_norms[best]), step_time]
+                        logger.log(row + params[best].flatten().tolist())
+                self.instrumentation.end_step(
+                    "qaoa-multistart", i, float(costs[best]), float(grad_norms[best]), step_time
+                )
+
+                converged = (grad_tol is not None and np.all(grad_norms < grad_tol)) or (
+                    cost_tol is not None and np.all(np.abs(costs - previous_costs) < cost_tol)
+                )
+                previous_costs = costs
+                if converged:
+                    print(f"Converged after {i} steps.")
+                    break
+        finally:
+            if logger is not None:
+                logger.close()
+
+        # keep the best trajectory
+        costs = batch_cost(params)
+        self.params = np.array(params[int(np.argmin(costs))], requires_grad=True)
+        return costs
+
+    @classmethod
+    def solve_batch(
+        cls,
+        graphs,
+        qaoa_layer_depth=2,
+        steps=50,
+        qaoa_layer_params=None,
+        logs_file=None,
+        log_flush_every=100,
+        optimizer="gd",
+        stepsize=0.01,
+        cost_tol=None,
+        grad_tol=None,
+        precision="double",
+        instrumentation=None,
+    ):
+        """
+        Solve several graphs with the same number of nodes together, on the "numpy-diag" device.
+
+        The graphs are simulated as one batch by `MultiGraphQAOASimulator`, which stacks their cost diagonals and
+        mixer weights, and their parameters of shape (graphs, 2, depth) are stepped together by a single optimizer.
+        The cost of each graph only depends on its own parameters, so this gives the same parameters as solving each
+        graph with `solve`, while paying the Python overhead of a simulation once per step for all graphs. This pays
+        off on small graphs, up to about 12 nodes.
+
+        Args:
+            graphs (list): The networkx graphs, with the same number of nodes labeled `0..n - 1`.
+            qaoa_layer_depth (int, optional): Depth of the QAOA layers. Defaults to 2.
+            steps (int, optional): Maximum number of optimization steps. Defaults to 50.
+            qaoa_layer_params (array-like, optional): Initial parameters, the gammas then the alphas, of shape
+                (2 * depth,) for all graphs or (graphs, 2 * depth). Defaults to None, for 0.5 for all.
+            logs_file (str, optional): Path to a file where the cost of every graph is logged at each step. Defaults
+                to None.
+            log_flush_every (int, optional): Number of steps buffered before appending them to the logs. Defaults to 100.
+            optimizer (str or optimizer, optional): One of ["gd", "adam", "nesterov"], or an instance of a PennyLane
+                gradient-based optimizer. Defaults to "gd".
+            stepsize (float, optional): Learning rate of the optimizers given by name. Defaults to 0.01.
+            cost_tol (float, optional): Stop early once the cost of every graph changes by less than `cost_tol` in a
+                step. Defaults to None.
+            grad_tol (float, optional): Stop early once the gradient norm of every graph is below `grad_tol`.
+                Defaults to None.
+            precision (str, optional): One of ["double", "single"], see `__init__`. Defaults to "double".
+            instrumentation (Instrumentation, optional): Timers, counters and profiling hooks shared by the solvers,
+                see `MISGraph`. The callback gets the mean cost and gradient norm of the graphs. Defaults to None.
+
+        Returns:
+            list: A solver for each graph, with its optimized parameters in `params`.
+        """
+        solvers = [
+            cls(graph=graph, device="numpy-diag", precision=precision, instrumentation=instrumentation)
+            for graph in graphs
+        ]
+        instrumentation = solvers[0].instrumentation
+        num_nodes = solvers[0].num_nodes
+        assert all(solver.num_nodes == num_nodes for solver in solvers), "The graphs must have the same size."
+        with instrumentation.phase("engine"):
+            engine = MultiGraphQAOASimulator(
+                [solver.cost_h for solver in solvers],
+                [solver.mixer_h for solver in solvers],
+                num_nodes,
+                dtype=PRECISIONS[precision],
+            )
+
+        if isinstance(optimizer, str):
+            optimizer = get_optimizer(optimizer, stepsize, steps)
+        else:
+            optimizer = copy.deepcopy(optimizer)
+        if isinstance(optimizer, (ScipyOptimizer, qml.SPSAOptimizer)):
+            raise ValueError(f"Batched solving needs a gradient-based PennyLane optimizer, got {optimizer}.")
+
+        if qaoa_layer_params is None:
+            qaoa_layer_params = [0.5] * (2 * qaoa_layer_depth)
+        params = np.broadcast_to(
+            np.reshape(np.asarray(qaoa_layer_params, dtype=float), (-1, 2, qaoa_layer_depth)),
+            (len(solvers), 2, qaoa_layer_depth),
+        )
+        params = np.array(params, requires_grad=True)
+
+        def grad_fn(params):
+            grad_fn.forward, grad = engine.value_and_gradient(params)
+            return grad
+
+        logger = None
+        if logs_file is not None:
+            columns = ["Timestamp", "Step", "StepTime"] + [f"Cost{g}" for g in range(len(solvers))]
+            logger = OptimizationLogger(logs_file, columns, log_flush_every)
+
+        previous_costs = np.full(len(solvers), np.nan)
+        num_steps = 0
+        try:
+            for i in tqdm(range(1, steps + 1)):
+                start = time.perf_counter()
+                with instrumentation.phase("gradient"):
+                    grad, costs = optimizer.compute_grad(engine.expval, (params,), {}, grad_fn=grad_fn)
+                with instrumentation.phase("update"):
+                    params = optimizer.apply_grad(grad, (params,))[0]
+                num_steps = i
+
+                step_time = time.perf_counter() - start
+                if logger is not None:
+                    with instrumentation.phase("logging"):
+                        logger.log([time.time(), i, step_time] + np.asarray(costs).tolist())
+
+                grad_norms = np.linalg.norm(np.reshape(grad[0], (len(solvers), -1)), axis=1)
+                instrumentation.end_step("qaoa-batch", i, float(np.mean(costs)), float(np.mean(grad_norms)), step_time)
+                converged = (grad_tol is not None and np.all(grad_norms < grad_tol)) or (
+                    cost_tol is not None and np.all(np.abs(costs - previous_costs) < cost_tol)
+                )
+                previous_costs = costs
+                if converged:
+                    print(f"Converged after {i} steps.")
+                    break
+        finally:
+            if logger is not None:
+                logger.close()
+
+        for solver, solver_params in zip(solvers, params):
+            solver.params = np.array(solver_params, requires_grad=True)
+            solver.qaoa_layer_depth = qaoa_layer_depth
+            solver.steps = steps
+            solver.num_steps = num_steps
+            solver.optimizer = optimizer
+        return solvers
+
+    def scan_landscape(self, gammas=np.linspace(0, np.pi, 100), alphas=np.linspace(0, np.pi, 100)):
+        """
+        Evaluate the depth 1 cost over a grid of gammas and alphas, e.g. to pick the initial parameters of `solve`.
+
+        The whole grid is computed in a single pass by `DiagonalQAOASimulator.landscape`, which reuses the cost
+        diagonal for every gamma and only evolves a few states through the mixer per alpha, also for PennyLane
+        devices. On "lightcone", `LightConeQAOAEvaluator.landscape` computes it in closed form.
+
+        Args:
+            gammas (array-like, optional): Cost layer parameters. Defaults to 100 values in [0, pi].
+            alphas (array-like, optional): Mixer layer parameters. Defaults to 100 values in [0, pi].
+
+        Returns:
+            tuple: The costs, of shape (len(gammas), len(alphas)), and the `(gamma, alpha)` pair of lowest cost.
+        """
+        engine = self.engine or DiagonalQAOASimulator(
+            self.cost_h, self.mixer_h, self.num_nodes, dtype=PRECISIONS[self.precision]
+        )
+        costs = engine.landscape(gammas, alphas)
+        best_gamma, best_alpha = np.unravel_index(np.argmin(costs), costs.shape)
+        return costs, (float(gammas[best_gamma]), float(alphas[best_alpha]))
+
+    def solve_components(self, workers=None, logs_file=None, top_k=16, **solve_kwargs):
+        """
+        Solve the MIS problem on each connected component of the graph independently, and stitch the solutions.
+
+        Each component with more than one node gets its own QAOA solver with one qubit per node of the component,
+        so the simulation cost is the sum of the components' costs instead of 2^num_nodes. Isolated nodes are
+        always in the MIS and are not simulated.
+
+        Args:
+            workers (int, optional): Number of processes solving components in parallel, None for one per CPU core
+                and 1 to solve them in this process. Defaults to None.
+            logs_file (str, optional): Path to a file where the optimization logs will be saved, with a "_c<index>"
+                suffix added for each component. Defaults to None.
+            top_k (int, optional): Number of most probable states decoded per component, see `decode_probs`.
+                Defaults to 16.
+            **solve_kwargs: Keyword arguments passed to `solve` for every component. The "checkpoint_file" and
+                "resume_from" paths get the same "_c<index>" suffix as `logs_file`.
+
+        Returns:
+            str: The decoded independent set of each component, stitched into a bitstring over the whole graph.
+        """
+        components = self.connected_components()
+        tasks = []
+        for i, component in enumerate(components):
+            if len(component) == 1:
+                continue
+            subgraph = nx.relabel_nodes(
+                self.graph.subgraph(component).copy(), {node: j for j, node in enumerate(component)}
+            )
+            component_kwargs = dict(solve_kwargs, logs_file=logs_file)
+            for key in ["logs_file", "checkpoint_file", "resume_from"]:
+                if component_kwargs.get(key) is not None:
+                    root, ext = os.path.splitext(component_kwargs[key])
+                    component_kwargs[key] = f"{root}_c{i}{ext}"
+            tasks.append((subgraph, self.device, self.precision, self.constrained, top_k, component_kwargs))
+
+        solutions = iter(map_components(_solve_component, tasks, workers))
+        bitstrings = ["1" if len(component) == 1 else next(solutions) for component in components]
+
+        nodes_bitstring = self.stitch_bitstrings(components, bitstrings)
+        self.set_mis_nodes(nodes_bitstring)
+        return nodes_bitstring
+
+    def solve_partitioned(
+        self, max_qubits=20, overlap=1, seed=None, workers=None, logs_file=None, top_k=16, **solve_kwargs
+    ):
+        """
+        Solve the MIS problem on a graph larger than the simulable qubit budget, by divide and conquer.
+
+        The graph is partitioned into overlapping parts of at most `max_qubits` nodes (see `MISGraph.partition`),
+        each part is solved with its own QAOA solver, in parallel processes, and the solutions of the parts' cores
+        are reconciled into a maximal independent set of the whole graph. The simulation cost is the sum of the
+        parts' 2^max_qubits costs instead of 2^num_nodes, and no statevector of the whole graph is ever simulated.
+        Parts without edges are all in the set and are not simulated.
+
+        Args:
+            max_qubits (int, optional): The maximum number of qubits of a part. Defaults to 20.
+            overlap (int, optional): Number of hops of the halo of neighbors solved with each part, so that its
+                boundary nodes are decided knowing their neighborhood, 0 for disjoint parts. Defaults to 1.
+            seed (int, optional): Seed of the min-cut bisections. Defaults to None.
+            workers (int, optional): Number of processes solving parts in parallel, see `solve_components`.
+                Defaults to None.
+            logs_file (str, optional): Path to a file where the optimization logs will be saved, with a "_p<index>"
+                suffix added for each part. Defaults to None.
+            top_k (int, optional): Number of most probable states decoded per part, see `decode_probs`.
+                Defaults to 16.
+            **solve_kwargs: Keyword arguments passed to `solve` for every part. The "checkpoint_file" and
+                "resume_from" paths get the same "_p<index>" suffix as `logs_file`.
+
+        Returns:
+            str: The reconciled bitstring over the whole graph.
+        """
+        partition = self.partition(max_qubits, overlap, seed)
+        print(f"Partitioned {self.num_nodes} nodes into {len(partition.parts)} parts of at most {max_qubits} qubits.")
+
+        tasks = []
+        for i, subgraph in enumerate(partition.subgraphs):
+            if subgraph.number_of_edges() == 0:
+                continue
+            part_kwargs = dict(solve_kwargs, logs_file=logs_file)
+            for key in ["logs_file", "checkpoint_file", "resume_from"]:
+                if part_kwargs.get(key) is not None:
+                    root, ext = os.path.splitext(part_kwargs[key])
+                    part_kwargs[key] = f"{root}_p{i}{ext}"
+            tasks.append((subgraph, self.device, self.precision, self.constrained, top_k, part_kwargs))
+
+        solutions = iter(map_components(_solve_component, tasks, workers))
+        bitstrings = [
+            "1" * len(subgraph) if subgraph.number_of_edges() == 0 else next(solutions)
+            for subgraph in partition.subgraphs
+        ]
+
+        nodes_bitstring = partition.reconcile(bitstrings)
+        print(f"Reconciled {partition.num_conflicts} conflicting boundary edges.")
+        self.set_mis_nodes(nodes_bitstring)
+        return nodes_bitstring
+
+    def solve_kernel(self, split_components=False, workers=None, max_qubits=None, overlap=1, top_k=16, **solve_kwargs):
+        """
+        Solve the MIS problem on the kernel of the graph (see `MISGraph.kernelize`), and lift the solution back.
+
+        Args:
+            split_components (bool, optional): Whether to solve each connected component of the kernel independently,
+                see `solve_components`. Defaults to False.
+            workers (int, optional): Number of processes solving components in parallel, see `solve_components`.
+                Defaults to None.
+            max_qubits (int, optional): The qubit budget of `solve_partitioned`, used when the kernel is larger.
+                Defaults to None, to always solve the kernel whole.
+            overlap (int, optional): The overlap of the parts of `solve_partitioned`. Defaults to 1.
+            top_k (int, optional): Number of most probable states decoded, see `decode_probs`. Defaults to 16.
+            **solve_kwargs: Keyword arguments passed to `solve`.
+
+        Returns:
+            str: The lifted bitstring over the whole graph.
+        """
+        kernel = self.kernelize()
+        print(f"Kernelized {self.num_nodes} nodes into {len(kernel.graph)} nodes.")
+
+        if len(kernel.graph) == 0:
+            kernel_bitstring = ""
+        else:
+            kernel_solver = PennylaneMIS_QAOA(
+                graph=kernel.graph,
+                device=self.device,
+                reuse_device=self.reuse_device,
+                precision=self.precision,
+                instrumentation=self.instrumentation,
+                constrained=self.constrained,
+            )
+            if max_qubits is not None and len(kernel.graph) > max_qubits:
+                kernel_bitstring = kernel_solver.solve_partitioned(
+                    max_qubits, overlap, workers=workers, top_k=top_k, **solve_kwargs
+                )
+            elif split_components:
+                kernel_bitstring = kernel_solver.solve_components(workers=workers, top_k=top_k, **solve_kwargs)
+            else:
+                kernel_solver.solve(**solve_kwargs)
+                kernel_solver.decode(top_k)
+                kernel_bitstring = kernel_solver.mis_nodes
+
+        nodes_bitstring = kernel.lift(kernel_bitstring)
+        self.set_mis_nodes(nodes_bitstring)
+        return nodes_bitstring
+
+    @instrumented("probs")
     def get_probs(self, draw_graph=True, plot_wait_time=None):
         """
         Get the probabilities of all possible states after running the QAOA circuit.
@@ -151,9 +1019,10 @@ class PennylaneMIS_QAOA(MISGraph):
             numpy.ndarray: An array of probabilities for all possible states.
         """
 
+        if self.device == "lightcone":
+            raise ValueError("The lightcone device has no statevector, decode the marginals with `decode_marginals`.")
         wires = range(self.num_nodes)
 
-        @qml.qnode(self.dev)
         def probability_circuit(gamma, alpha):
             """
             Quantum circuit to compute the probabilities of all possible states.
@@ -168,8 +1037,13 @@ class PennylaneMIS_QAOA(MISGraph):
             self.circuit([gamma, alpha])
             return qml.probs(wires=wires)
 
-        probs = probability_circuit(self.params[0], self.params[1])
+        if self.engine is None:
+            probs = qml.qnode(self.dev)(probability_circuit)(self.params[0], self.params[1])
+        else:
+            probs = self.engine.probs(self.params)
         if draw_graph:
+            import matplotlib.pyplot as plt
+
             plt.figure()
             plt.title("Probability Distribution")
             plt.style.use("ggplot")
@@ -181,6 +1055,58 @@ class PennylaneMIS_QAOA(MISGraph):
             else: plt.show()
         return probs
 
+    @instrumented("sample")
+    def sample(self, shots=1000, seed=None):
+        """
+        Sample bitstrings from the final state of the QAOA circuit, without returning the probabilities of all states.
+
+        Args:
+            shots (int, optional): The number of samples. Defaults to 1000.
+            seed (int, optional): Seed of the "numpy-diag" sampler; PennyLane devices use their own. Defaults to None.
+
+        Returns:
+            Counter: The number of samples of each sampled bitstring, in wire order, like `AdiabaticMIS.solve`.
+        """
+        if self.device == "lightcone":
+            raise ValueError("The lightcone device has no statevector to sample from, see `decode_marginals`.")
+        if self.engine is None:
+
+            def counts_circuit(params):
+                self.circuit(params)
+                return qml.counts(wires=range(self.num_nodes))
+
+            counts = qml.qnode(self.dev)(counts_circuit)(self.params, shots=shots)
+            return Counter({bitstring: int(count) for bitstring, count in counts.items()})
+
+        states, counts = np.unique(self.engine.sample(self.params, shots, seed), return_counts=True)
+        return Counter({format(int(state), f"0{self.num_nodes}b"): int(count) for state, count in zip(states, counts)})
+
+    @instrumented("decode")
+    def decode_marginals(self):
+        """
+        Set the MIS nodes to the independent set decoded from the probability of each node to be in the set, see
+        `decode_marginals`. On "lightcone", these are computed in closed form, so graphs of thousands of nodes are
+        decoded without any statevector.
+
+        Returns:
+            dict: The result of `decode_marginals`.
+        """
+        if self.device == "lightcone":
+            marginals = self.engine.marginals(self.params)
+        else:
+            probs = np.reshape(self.get_probs(False), (2,) * self.num_nodes)
+            marginals = [np.sum(np.take(probs, 1, axis=wire)) for wire in range(self.num_nodes)]
+        decoded = decode_marginals(self.graph, marginals)
+        self.set_mis_nodes(decoded["bitstring"])
+        return decoded
+
+    def decode(self, top_k=16):
+        """Decode the MIS nodes from the final state, from its `top_k` most probable states or, on "lightcone", from
+        its marginals."""
+        if self.device == "lightcone":
+            return self.decode_marginals()
+        return self.decode_probs(self.get_probs(False), top_k)
+
     def set_mis_nodes(self, nodes_bitstring):
         """
         Set the nodes belonging to the maximum independent set based on a given bitstring.
@@ -191,15 +1117,32 @@ class PennylaneMIS_QAOA(MISGraph):
         self.mis_nodes = "0" * (self.num_nodes - len(nodes_bitstring)) + nodes_bitstring
 
 
+def _solve_component(args):
+    """
+    Solve a single connected component with QAOA, in a worker process of `solve_components`.
+
+    Args:
+        args (tuple): `(graph, device, precision, constrained, top_k, solve_kwargs)`, the component relabeled to
+            nodes 0..k-1.
+
+    Returns:
+        str: The independent set of the component decoded from its most probable states.
+    """
+    graph, device, precision, constrained, top_k, solve_kwargs = args
+    solver = PennylaneMIS_QAOA(
+        graph=graph, device=device, reuse_device=True, precision=precision, constrained=constrained
+    )
+    solver.solve(**solve_kwargs)
+    solver.decode(top_k)
+    return solver.mis_nodes
+
+
 def main(num_nodes):
 
     solver = PennylaneMIS_QAOA(num_nodes)
     solver.draw_graph("Generated Graph")
     solver.solve(steps=50, logs_file=f"logs_{num_nodes}.txt")
-    probs = solver.get_probs()
-    ans = np.argmax(probs)
-    ans_nodes = bin(ans)[2:]
-    solver.set_mis_nodes(ans_nodes)
+    solver.decode_probs(solver.get_probs())
     solver.draw_graph("MIS nodes (in green)", with_mis_nodes=True)
 
 
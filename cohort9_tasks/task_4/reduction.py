@@ -0,0 +1,116 @@
+import itertools
+import networkx as nx
+
+
+class MISKernel:
+    """
+    Reduce a graph to its MIS kernel with classic reduction rules, and lift kernel solutions back.
+
+    The rules are applied until none of them matches:
+
+    - isolated and pendant vertices, and more generally simplicial vertices (whose neighbors form a
+      clique), are in some MIS: include them and remove their closed neighborhood.
+    - vertex domination: for adjacent u, v with N[u] a subset of N[v], some MIS avoids v: remove v.
+    - degree-2 folding: a vertex v with non-adjacent neighbors u, w is folded with them into a single
+      new vertex adjacent to N(u) and N(w). The MIS of the graph is one larger than the folded graph's.
+
+    Every removed vertex halves the statevector of the quantum solvers, and a solution of the kernel is
+    lifted to a solution of the original graph of the same quality, by undoing the reductions in reverse.
+    """
+
+    def __init__(self, graph, fold=True):
+        """
+        Reduce the graph.
+
+        Args:
+            graph (nx.Graph): The graph to reduce.
+            fold (bool, optional): Whether to apply degree-2 folding. Folded vertices have no position, so
+                disable folding to keep the kernel a subgraph, e.g. a unit-disk graph of atoms. Defaults to True.
+        """
+        self.original_nodes = list(graph.nodes)
+        self.fold = fold
+
+        # reductions, in the order they were applied:
+        # ("include", v), ("exclude", v) or ("fold", v, u, w, folded_vertex)
+        self.reductions = []
+        self.num_folds = 0
+
+        residual = graph.copy()
+        while self._reduce(residual):
+            pass
+
+        # the kernel, relabeled to nodes 0..k-1 for the solvers
+        self.kernel_nodes = list(residual.nodes)
+        self.graph = nx.relabel_nodes(residual, {node: i for i, node in enumerate(self.kernel_nodes)})
+
+    def _reduce(self, residual):
+        """Apply one pass of the reduction rules. Returns whether the residual graph changed."""
+        changed = False
+        for v in list(residual.nodes):
+            if v not in residual:
+                continue
+            neighbors = list(residual.neighbors(v))
+
+            # isolated, pendant and simplicial vertices
+            if all(residual.has_edge(u, w) for u, w in itertools.combinations(neighbors, 2)):
+                self.reductions.append(("include", v))
+                residual.remove_nodes_from(neighbors + [v])
+                changed = True
+
+            # degree-2 folding (a degree-2 vertex with adjacent neighbors is simplicial)
+            elif self.fold and len(neighbors) == 2:
+                u, w = neighbors
+                folded_vertex = ("fold", self.num_folds)
+                self.num_folds += 1
+                new_neighbors = (set(residual.neighbors(u)) | set(residual.neighbors(w))) - {v, u, w}
+                residual.remove_nodes_from([v, u, w])
+                residual.add_node(folded_vertex)
+                residual.add_edges_from((folded_vertex, x) for x in new_neighbors)
+                self.reductions.append(("fold", v, u, w, folded_vertex))
+                changed = True
+
+        # vertex domination
+        for u, v in list(residual.edges):
+            if u not in residual or v not in residual or not residual.has_edge(u, v):
+                continue
+            closed_u = set(residual.neighbors(u)) | {u}
+            closed_v = set(residual.neighbors(v)) | {v}
+            if closed_u <= closed_v:
+                dominating = v
+            elif closed_v <= closed_u:
+                dominating = u
+            else:
+                continue
+            self.reductions.append(("exclude", dominating))
+            residual.remove_node(dominating)
+            changed = True
+
+        return changed
+
+    @property
+    def num_included(self):
+        """Number of MIS nodes fixed by the reductions, i.e. MIS(graph) = MIS(kernel) + num_included."""
+        return sum(reduction[0] in ["include", "fold"] for reduction in self.reductions)
+
+    def lift(self, kernel_bitstring):
+        """
+        Lift a solution of the kernel to a solution of the original graph.
+
+        Args:
+            kernel_bitstring (str): Bitstring over the kernel nodes 0..k-1, where '1' indicates a node is in the set.
+
+        Returns:
+            str: Bitstring over the nodes of the original graph, in graph order.
+        """
+        solution = {node for node, bit in zip(self.kernel_nodes, kernel_bitstring) if bit == "1"}
+        for reduction in reversed(self.reductions):
+            if reduction[0] == "include":
+                solution.add(reduction[1])
+            elif reduction[0] == "fold":
+                _, v, u, w, folded_vertex = reduction
+                if folded_vertex in solution:
+                    solution.remove(folded_vertex)
+                    solution |= {u, w}
+                else:
+                    solution.add(v)
+        return "".join("1" if node in solution else "0" for node in self.original_nodes)
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def interp_warm_start(params):
+    """
+    Extend optimized depth-p QAOA parameters to depth p+1 with the INTERP heuristic.
+
+    Each of the gamma and alpha schedules is linearly interpolated onto p+1 evenly spaced points
+    (Zhou et al., "Quantum Approximate Optimization Algorithm: Performance, Mechanism, and
+    Implementation on Near-Term Devices").
+
+    Args:
+        params (array-like): Parameters of shape (2, p), the gamma and alpha values.
+
+    Returns:
+        numpy.ndarray: Parameters of shape (2, p + 1).
+    """
+    params = np.asarray(params, dtype=float)
+    depth = params.shape[1]
+
+    # pad with zeros, so that schedule[i - 1] and schedule[i] are defined for i = 1..p+1
+    padded = np.pad(params, ((0, 0), (1, 1)))
+    i = np.arange(1, depth + 2)
+    return (i - 1) / depth * padded[:, i - 1] + (depth - i + 1) / depth * padded[:, i]
+
+
+def _fourier_bases(depth, num_freqs):
+    """Sine (gamma) and cosine (alpha) bases of the FOURIER heuristic, of shape (depth, num_freqs)."""
+    i = np.arange(1, depth + 1)[:, None] - 0.5
+    k = np.arange(1, num_freqs + 1)[None, :] - 0.5
+    angles = k * i * np.pi / depth
+    return np.sin(angles), np.cos(angles)
+
+
+def fourier_warm_start(params):
+    """
+    Extend optimized depth-p QAOA parameters to depth p+1 with the FOURIER heuristic.
+
+    The schedules are expanded into p sine (gamma) and cosine (alpha) frequency components, which
+    are then resampled at depth p+1 (Zhou et al.).
+
+    Args:
+        params (array-like): Parameters of shape (2, p), the gamma and alpha values.
+
+    Returns:
+        numpy.ndarray: Parameters of shape (2, p + 1).
+    """
+    gammas, alphas = np.asarray(params, dtype=float)
+    depth = len(gammas)
+
+    sin_basis, cos_basis = _fourier_bases(depth, depth)
+    u = np.linalg.solve(sin_basis, gammas)
+    v = np.linalg.solve(cos_basis, alphas)
+
+    sin_basis, cos_basis = _fourier_bases(depth + 1, depth)
+    return np.stack([sin_basis @ u, cos_basis @ v])
+
+
+WARM_STARTS = {
+    "interp": interp_warm_start,
+    "fourier": fourier_warm_start,
+}
@@ -0,0 +1,32 @@
+import itertools
+from collections import Counter
+
+import pytest
+
+from task_4.adiabatic import AdiabaticMIS
+
+
+@pytest.fixture
+def all_ones_counts(monkeypatch):
+    # the most common bitstring selects every node, which is never independent
+    def solve(self, nodes=None, **kwargs):
+        num_nodes = self.num_nodes if nodes is None else len(nodes)
+        return Counter({"1" * num_nodes: 10, "0" * num_nodes: 1})
+
+    monkeypatch.setattr(AdiabaticMIS, "solve", solve)
+
+
+def is_independent(solver, bitstring):
+    nodes = [node for node, bit in zip(solver.graph.nodes, bitstring) if bit == "1"]
+    return not any(solver.graph.has_edge(u, v) for u, v in itertools.combinations(nodes, 2))
+
+
+def test_solve_kernel_repairs_the_kernel_bitstring(all_ones_counts):
+    solver = AdiabaticMIS(12, lattice="triangular")
+    assert len(solver.kernelize(fold=False).graph) > 0
+    assert is_independent(solver, solver.solve_kernel())
+
+
+def test_solve_components_repairs_the_component_bitstrings(all_ones_counts):
+    solver = AdiabaticMIS(9)
+    assert is_independent(solver, solver.solve_components(workers=1))
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from pulser import Pulse, Register, Sequence
+from pulser.devices import DigitalAnalogDevice
+from pulser.waveforms import InterpolatedWaveform
+from pulser_simulation import QutipEmulator
+
+from task_4.blockade_emulator import BlockadeSubspaceEmulator
+
+
+def final_probabilities(coords, omega=1.0, total_time=2000):
+    """Probabilities of the independent sets of the blockade subspace, from both emulators."""
+    register = Register.from_coordinates(np.array(coords, dtype=float), prefix="q")
+    pulse = Pulse(
+        InterpolatedWaveform(total_time, [1e-9, omega, 1e-9]), InterpolatedWaveform(total_time, [-5, 0, 5]), 0
+    )
+    sequence = Sequence(register, DigitalAnalogDevice)
+    sequence.declare_channel("ising", "rydberg_global")
+    sequence.add(pulse, "ising")
+    qutip_state = QutipEmulator.from_sequence(sequence).run().get_final_state().full().ravel()
+
+    emulator = BlockadeSubspaceEmulator(
+        list(register.qubits.values()),
+        DigitalAnalogDevice.rydberg_blockade_radius(omega),
+        DigitalAnalogDevice.interaction_coeff,
+    )
+    state = emulator.run(pulse.amplitude.samples, pulse.detuning.samples)
+
+    # QuTiP's basis has atom 0 as the most significant qubit, and |r> first
+    num_atoms = len(coords)
+    qutip_index = [
+        sum((1 - (subset >> i & 1)) << (num_atoms - 1 - i) for i in range(num_atoms)) for subset in emulator.states
+    ]
+    return np.abs(state) ** 2, np.abs(qutip_state[qutip_index]) ** 2
+
+
+@pytest.mark.parametrize(
+    "coords",
+    [
+        [[0, 0], [5, 0], [20, 0], [25, 0]],  # two blockaded pairs, weakly interacting with each other
+        [[0, 0], [5, 0], [2.5, 4.33]],  # a blockaded triangle
+    ],
+)
+def test_matches_qutip_in_the_strong_blockade_regime(coords):
+    # C6 / r^6 is about 350 rad/us at 5 um, far above the detuning of 5 rad/us
+    probs, qutip_probs = final_probabilities(coords)
+    assert qutip_probs.sum() > 0.999
+    assert np.allclose(probs, qutip_probs, atol=1e-3)
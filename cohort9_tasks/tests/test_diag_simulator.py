@@ -0,0 +1,37 @@
+import networkx as nx
+import numpy as np
+import pennylane as qml
+import pytest
+from pennylane import numpy as pnp
+from pennylane import qaoa
+
+from task_4.diag_simulator import DiagonalQAOASimulator, MultiGraphQAOASimulator
+from task_4.qaoa import PennylaneMIS_QAOA
+
+
+@pytest.mark.parametrize("constrained", [True, False])
+def test_matches_default_qubit(constrained):
+    graph = nx.Graph([(0, 1), (1, 2), (2, 3), (3, 0), (0, 2), (3, 4)])
+    params = pnp.array([[0.3, 0.7], [0.4, 0.2]], requires_grad=True)
+    solver = PennylaneMIS_QAOA(graph=graph, device="default.qubit", constrained=constrained)
+    solver.solve(qaoa_layer_params=params, qaoa_layer_depth=2, steps=0, diff_method="backprop")
+    engine = DiagonalQAOASimulator(solver.cost_h, solver.mixer_h, len(graph))
+
+    assert np.isclose(engine.expval(params), solver.cost_function(params))
+    assert np.allclose(engine.probs(params), solver.get_probs(False))
+    expected_grad = qml.grad(solver.cost_function)(params)
+    assert np.allclose(engine.gradient(params), expected_grad)
+    assert np.allclose(engine.gradient(params, diff_method="finite-diff"), expected_grad, atol=1e-6)
+
+
+def test_multigraph_landscape_matches_expval():
+    graphs = [nx.cycle_graph(5), nx.path_graph(5), nx.star_graph(4)]
+    hamiltonians = [qaoa.cost.max_independent_set(graph, constrained=True) for graph in graphs]
+    engine = MultiGraphQAOASimulator([h[0] for h in hamiltonians], [h[1] for h in hamiltonians], 5)
+    gammas, alphas = np.linspace(0, 1, 3), np.linspace(0, 2, 4)
+    landscape = engine.landscape(gammas, alphas)
+    assert landscape.shape == (3, 4, 3)
+    for i, gamma in enumerate(gammas):
+        for j, alpha in enumerate(alphas):
+            params = np.tile([[gamma], [alpha]], (3, 1, 1))
+            assert np.allclose(landscape[i, j], engine.expval(params))
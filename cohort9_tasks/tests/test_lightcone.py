@@ -0,0 +1,50 @@
+import networkx as nx
+import numpy as np
+import pennylane as qml
+import pytest
+
+from task_4.diag_simulator import DiagonalQAOASimulator
+from task_4.lightcone import LightConeQAOAEvaluator, unconstrained_mis_hamiltonians
+from utils.graph_utils import get_square_graph
+
+GRAPHS = {
+    "gnp": nx.fast_gnp_random_graph(9, 0.4, seed=2),
+    "square": get_square_graph(10)[0],
+    "triangular": get_square_graph(10, radius=1.1, lattice="triangular")[0],
+}
+
+
+def test_unconstrained_mis_hamiltonians():
+    graph = GRAPHS["gnp"]
+    cost_h, mixer_h = unconstrained_mis_hamiltonians(graph)
+    expected_cost_h, expected_mixer_h = qml.qaoa.cost.max_independent_set(graph, constrained=False)
+    simulator = DiagonalQAOASimulator(cost_h, mixer_h, len(graph))
+    expected = DiagonalQAOASimulator(expected_cost_h, expected_mixer_h, len(graph))
+    assert np.allclose(simulator.cost_diag, expected.cost_diag)
+
+
+@pytest.mark.parametrize("name", GRAPHS)
+def test_matches_diagonal_simulator(name):
+    graph = GRAPHS[name]
+    cost_h, mixer_h = unconstrained_mis_hamiltonians(graph)
+    evaluator = LightConeQAOAEvaluator(cost_h, mixer_h, len(graph))
+    simulator = DiagonalQAOASimulator(cost_h, mixer_h, len(graph))
+
+    for params in np.random.default_rng(0).uniform(-np.pi, np.pi, size=(5, 2, 1)):
+        value, grad = evaluator.value_and_gradient(params)
+        assert np.isclose(value, simulator.expval(params))
+        assert np.allclose(grad, simulator.gradient(params), atol=1e-8)
+
+        # the probability of each qubit in |1>, wire 0 being the most significant bit
+        probs = simulator.probs(params).reshape((2,) * len(graph))
+        marginals = [probs.sum(axis=tuple(w for w in range(len(graph)) if w != u))[1] for u in range(len(graph))]
+        assert np.allclose(evaluator.marginals(params), marginals)
+
+    gammas, alphas = np.linspace(-1, 1, 4), np.linspace(-1, 1, 3)
+    assert np.allclose(evaluator.landscape(gammas, alphas), simulator.landscape(gammas, alphas))
+
+
+def test_rejects_deeper_circuits():
+    cost_h, mixer_h = unconstrained_mis_hamiltonians(GRAPHS["square"])
+    with pytest.raises(ValueError):
+        LightConeQAOAEvaluator(cost_h, mixer_h, 10).expval(np.zeros((2, 2)))
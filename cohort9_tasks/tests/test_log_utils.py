@@ -0,0 +1,35 @@
+import time
+
+import numpy as np
+import pytest
+
+from utils.log_utils import OptimizationLogger, read_logs
+
+
+@pytest.mark.parametrize("extension", [".csv", ".bin"])
+def test_round_trip(tmp_path, extension):
+    logs_file = str(tmp_path / f"logs{extension}")
+    columns = ["Timestamp", "Step", "Cost", 0, 1]
+    rows = [[time.time(), step, np.sin(step) / 3, step / 7, np.nan] for step in range(25)]
+
+    # the rows are written over several flushes, and the last ones on close
+    with OptimizationLogger(logs_file, columns, flush_every=10) as logger:
+        for row in rows[:20]:
+            logger.log(row)
+    with OptimizationLogger(logs_file, columns, flush_every=10, append=True) as logger:
+        for row in rows[20:]:
+            logger.log(row)
+
+    df = read_logs(logs_file)
+    assert list(df.columns) == ["Timestamp", "Step", "Cost", "0", "1"]
+    # pandas parses CSV floats to within a few ulps
+    assert np.allclose(df[["Step", "Cost", "0", "1"]], np.array(rows)[:, 1:], rtol=1e-13, atol=0, equal_nan=True)
+    assert np.allclose(df["Timestamp"].astype("int64") / 1e9, np.array(rows)[:, 0], rtol=0, atol=1e-3)
+
+
+def test_truncates_without_append(tmp_path):
+    logs_file = str(tmp_path / "logs.bin")
+    for value in [1.0, 2.0]:
+        with OptimizationLogger(logs_file, ["Cost"]) as logger:
+            logger.log([value])
+    assert read_logs(logs_file)["Cost"].tolist() == [2.0]
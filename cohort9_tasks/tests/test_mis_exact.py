@@ -0,0 +1,46 @@
+import itertools
+
+import networkx as nx
+import pytest
+
+from utils.graph_utils import approximation_ratio, mis_exact
+
+
+def brute_force_mis_size(graph):
+    nodes = list(graph.nodes)
+    for size in range(len(nodes), 0, -1):
+        for subset in itertools.combinations(nodes, size):
+            if not any(graph.has_edge(u, v) for u, v in itertools.combinations(subset, 2)):
+                return size
+    return 0
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_brute_force(seed):
+    graph = nx.fast_gnp_random_graph(8 + seed % 7, [0.15, 0.3, 0.5, 0.8][seed % 4], seed=seed)
+    solution = mis_exact(graph)
+    assert len(solution) == brute_force_mis_size(graph)
+    assert not any(graph.has_edge(u, v) for u, v in itertools.combinations(solution, 2))
+    assert solution == [node for node in graph.nodes if node in solution]
+
+
+def test_known_graphs():
+    assert len(mis_exact(nx.cycle_graph(101))) == 50
+    assert len(mis_exact(nx.dodecahedral_graph())) == 8
+    assert len(mis_exact(nx.icosahedral_graph())) == 3
+    assert len(mis_exact(nx.complete_graph(30))) == 1
+    assert len(mis_exact(nx.petersen_graph())) == 4
+
+
+def test_time_limit():
+    graph = nx.gnp_random_graph(300, 8 / 299, seed=0)
+    with pytest.raises(TimeoutError):
+        mis_exact(graph, time_limit=0.1)
+
+
+def test_approximation_ratio():
+    graph = nx.cycle_graph(6)
+    assert approximation_ratio(graph, "101010") == (3, True, 1.0)
+    assert approximation_ratio(graph, "100100") == (2, True, 2 / 3)
+    assert approximation_ratio(graph, "110000") == (2, False, 0.0)
+    assert approximation_ratio(nx.gnp_random_graph(300, 8 / 299, seed=0), "1", time_limit=0.1) == (1, True, None)
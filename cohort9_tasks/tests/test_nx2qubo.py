@@ -0,0 +1,29 @@
+import itertools
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from utils.graph_utils import bitstrings_to_array, convert_to_qubo, convert_to_sparse_qubo, evaluate_qubo
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sparse_qubo_matches_dense(seed):
+    graph = nx.fast_gnp_random_graph(12, 0.3, seed=seed)
+    assert np.array_equal(convert_to_sparse_qubo(graph).toarray(), convert_to_qubo(graph))
+
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_evaluate_qubo(sparse):
+    graph = nx.fast_gnp_random_graph(8, 0.4, seed=1)
+    qubo = convert_to_sparse_qubo(graph) if sparse else convert_to_qubo(graph)
+    bitstrings = ["".join(bits) for bits in itertools.product("01", repeat=len(graph))]
+    # a small batch_bits splits the bitstrings into many batches
+    energies, violations = evaluate_qubo(qubo, bitstrings, batch_bits=64)
+
+    x = bitstrings_to_array(bitstrings).astype(float)
+    assert np.allclose(energies, np.einsum("ij,jk,ik->i", x, convert_to_qubo(graph), x))
+    expected_violations = [sum(bits[u] == bits[v] == "1" for u, v in graph.edges) for bits in bitstrings]
+    assert np.array_equal(violations, expected_violations)
+    # 2 * penalty per violated edge, minus the reward of each selected node
+    assert np.allclose(energies, 40 * violations - 10 * x.sum(axis=1))
@@ -0,0 +1,17 @@
+import pennylane as qml
+import pytest
+
+from task_4.optimizers import ScipyOptimizer, get_optimizer
+
+
+def test_get_optimizer():
+    assert isinstance(get_optimizer("Adam"), qml.AdamOptimizer)
+    optimizer = get_optimizer("l-bfgs-b")
+    assert isinstance(optimizer, ScipyOptimizer)
+    assert optimizer.method == "L-BFGS-B" and optimizer.uses_gradient
+
+
+@pytest.mark.parametrize("name", ["adamw", "dogleg", ""])
+def test_unknown_optimizer(name):
+    with pytest.raises(ValueError, match="COBYLA"):
+        get_optimizer(name)
@@ -0,0 +1,63 @@
+import networkx as nx
+import numpy as np
+import pennylane as qml
+import pytest
+
+from task_4.qaoa import PennylaneMIS_QAOA
+from utils.log_utils import read_logs
+
+
+def make_solver():
+    return PennylaneMIS_QAOA(graph=nx.cycle_graph(5), device="numpy-diag")
+
+
+def test_depth_ladder_with_adam_instance():
+    solver = make_solver()
+    history = solver.solve_depth_ladder(3, steps=3, optimizer=qml.AdamOptimizer(0.05))
+    assert [entry["params"].shape for entry in history] == [(2, 1), (2, 2), (2, 3)]
+
+
+def test_solve_does_not_reuse_optimizer_state():
+    solver = make_solver()
+    solver.solve(qaoa_layer_depth=3, steps=3, optimizer="adam")
+    solver.solve(qaoa_layer_depth=1, steps=3)
+    assert solver.params.shape == (2, 1)
+    assert isinstance(solver.optimizer, qml.AdamOptimizer)
+
+
+def test_multistart_after_adam_solve():
+    solver = make_solver()
+    solver.solve(qaoa_layer_depth=2, steps=3, optimizer="adam")
+    costs = solver.solve_multistart(num_starts=3, qaoa_layer_depth=2, steps=3, seed=0)
+    fresh_costs = make_solver().solve_multistart(num_starts=3, qaoa_layer_depth=2, steps=3, seed=0, optimizer="adam")
+    assert np.allclose(costs, fresh_costs)
+
+
+def test_resumed_solve_matches_uninterrupted(tmp_path):
+    checkpoint_file = str(tmp_path / "checkpoint.pkl")
+    logs_file = str(tmp_path / "logs.csv")
+
+    kwargs = dict(qaoa_layer_depth=2, optimizer="adam", stepsize=0.05)
+    checkpoint_kwargs = dict(kwargs, checkpoint_file=checkpoint_file, checkpoint_every=5, logs_file=logs_file)
+
+    solver = make_solver()
+    solver.solve(steps=10, **kwargs)
+    # a run preempted after its checkpoint at step 5, then rerun with resume_from
+    interrupted = make_solver()
+    interrupted.solve(steps=5, **checkpoint_kwargs)
+    interrupted.solve(steps=10, resume_from=checkpoint_file, **checkpoint_kwargs)
+
+    assert interrupted.num_steps == 10
+    assert np.allclose(interrupted.params, solver.params)
+    logs = read_logs(logs_file)
+    assert logs["Step"].tolist() == list(range(11))
+    assert np.allclose(logs[["0", "1", "2", "3"]].iloc[-1], np.ravel(solver.params))
+
+
+def test_adjoint_needs_numpy_diag():
+    solver = PennylaneMIS_QAOA(graph=nx.cycle_graph(4), device="default.qubit")
+    with pytest.raises(ValueError, match="adjoint"):
+        solver.solve(qaoa_layer_depth=1, steps=1, diff_method="adjoint")
+    with pytest.raises(ValueError, match="adjoint"):
+        solver.solve_multistart(num_starts=2, qaoa_layer_depth=1, steps=1, diff_method="adjoint")
+    make_solver().solve(qaoa_layer_depth=1, steps=1, diff_method="adjoint")
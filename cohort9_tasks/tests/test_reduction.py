@@ -0,0 +1,30 @@
+import itertools
+
+import networkx as nx
+import pytest
+
+from task_4.reduction import MISKernel
+from utils.graph_utils import mis_exact
+
+
+@pytest.mark.parametrize("fold", [True, False])
+@pytest.mark.parametrize("seed", range(20))
+def test_lifted_kernel_mis_is_maximum(seed, fold):
+    graph = nx.fast_gnp_random_graph(10 + seed, [0.1, 0.2, 0.3, 0.5][seed % 4], seed=seed)
+    kernel = MISKernel(graph, fold=fold)
+    kernel_mis = set(mis_exact(kernel.graph))
+    lifted = kernel.lift("".join("1" if node in kernel_mis else "0" for node in kernel.graph.nodes))
+
+    nodes = [node for node, bit in zip(graph.nodes, lifted) if bit == "1"]
+    assert len(lifted) == len(graph)
+    assert not any(graph.has_edge(u, v) for u, v in itertools.combinations(nodes, 2))
+    assert len(nodes) == len(mis_exact(graph))
+
+
+def test_kernel_without_folding_is_a_subgraph():
+    graph = nx.fast_gnp_random_graph(15, 0.2, seed=5)
+    kernel = MISKernel(graph, fold=False)
+    assert 0 < len(kernel.graph) < len(graph)
+    relabeled = nx.relabel_nodes(kernel.graph, dict(enumerate(kernel.kernel_nodes)))
+    assert all(graph.has_edge(u, v) for u, v in relabeled.edges)
+    assert kernel.num_folds == 0
@@ -0,0 +1,53 @@
+import itertools
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from utils.graph_utils import get_square_graph
+from utils.graph_utils.square_graph import lattice_coords
+
+
+def brute_force_square_graph(num_nodes):
+    # the original all-pairs construction, on a row-major square grid
+    edge_length = int(np.ceil(np.sqrt(num_nodes)))
+    coords = np.array([(r, c) for r in range(edge_length) for c in range(edge_length)])[:num_nodes]
+    graph = nx.Graph()
+    graph.add_nodes_from(range(num_nodes))
+    graph.add_edges_from(
+        (i, j) for i, j in itertools.combinations(range(num_nodes), 2) if np.linalg.norm(coords[i] - coords[j]) < 1.5
+    )
+    return graph, coords
+
+
+@pytest.mark.parametrize("num_nodes", [1, 3, 5, 6, 7, 16, 23])
+def test_default_square_graph_is_unchanged(num_nodes):
+    graph, coords = get_square_graph(num_nodes)
+    expected_graph, expected_coords = brute_force_square_graph(num_nodes)
+    assert np.array_equal(coords, expected_coords)
+    assert list(graph.nodes) == list(expected_graph.nodes)
+    assert sorted(graph.edges) == sorted(expected_graph.edges)
+
+
+def test_triangular_graph():
+    graph, coords = get_square_graph(49, radius=1.1, lattice="triangular")
+    distances = np.linalg.norm(coords[:, None] - coords[None], axis=-1)
+    # every edge joins nearest neighbors, and the interior sites have the six of a triangular lattice
+    assert all(np.isclose(distances[u, v], 1) for u, v in graph.edges)
+    assert max(dict(graph.degree).values()) == 6
+    assert graph.number_of_edges() == np.sum(np.isclose(distances, 1)) // 2
+
+
+def test_vacancies():
+    graph, coords = get_square_graph(30, lattice="triangular", vacancy_fraction=0.25, seed=3)
+    assert len(graph) == len(coords) == 30
+    sites = lattice_coords(40, "triangular")
+    assert all(np.isclose(sites, coord).all(axis=1).any() for coord in coords)
+
+    same_graph, same_coords = get_square_graph(30, lattice="triangular", vacancy_fraction=0.25, seed=3)
+    assert np.array_equal(coords, same_coords) and sorted(graph.edges) == sorted(same_graph.edges)
+
+
+def test_unknown_lattice():
+    with pytest.raises(ValueError):
+        get_square_graph(4, lattice="hexagonal")
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import networkx as nx
+from networkx.algorithms.isomorphism import GraphMatcher
+
+
+def graph_fingerprint(graph, isomorphic=True):
+    """
+    Fingerprint of a graph, used as part of the cache key.
+
+    Args:
+        graph (nx.Graph): The graph, with nodes taken in graph order.
+        isomorphic (bool, optional): Whether isomorphic graphs share the fingerprint (a Weisfeiler-Lehman hash), or
+            only graphs with the same edges between the same node positions. Defaults to True.
+
+    Returns:
+        str: The fingerprint.
+    """
+    graph = nx.convert_node_labels_to_integers(graph)
+    if isomorphic:
+        return f"{len(graph)}:{graph.number_of_edges()}:{nx.weisfeiler_lehman_graph_hash(graph, iterations=3)}"
+    return f"{len(graph)}:{sorted(tuple(sorted(edge)) for edge in graph.edges)}"
+
+
+def relabel_bitstring(bitstring, mapping):
+    """Move bit i of `bitstring` to position `mapping[i]`."""
+    bits = ["0"] * len(bitstring)
+    for i, bit in enumerate(bitstring):
+        bits[mapping[i]] = bit
+    return "".join(bits)
+
+
+class ResultCache:
+    """
+    A persistent cache of solver results, in a SQLite database.
+
+    Results are keyed by a fingerprint of the graph (see `graph_fingerprint`) and the solver parameters. With
+    `isomorphic=True`, a result stored for a graph is also returned for any graph isomorphic to it: candidates
+    sharing the fingerprint are checked with VF2, and the bitstrings of the result are relabeled to the new graph.
+    The least recently used results are evicted once the cache holds more than `max_entries` results or more than
+    `max_size_mb` of results.
+
+    A result is a JSON-serializable dict. Bitstrings over the nodes of the graph, in graph order, are expected as the
+    keys of its "bitstrings" dict (e.g. probabilities or counts), and are the only part of the result relabeled.
+
+    Every call opens its own connection, so the cache can be shared by worker processes.
+    """
+
+    def __init__(self, cache_dir="cache", max_entries=10000, max_size_mb=100):
+        """
+        Initialize the cache, creating the database if needed.
+
+        Args:
+            cache_dir (str, optional): Directory of the database. Defaults to "cache".
+            max_entries (int, optional): Maximum number of results kept. Defaults to 10000.
+            max_size_mb (float, optional): Maximum total size of the results kept, in MB. Defaults to 100.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "results.sqlite")
+        self.max_entries = max_entries
+        self.max_size = max_size_mb * 2**20
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "id INTEGER PRIMARY KEY, key TEXT, edges TEXT, result TEXT, size INTEGER, last_access REAL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS results_key ON results (key)")
+            connection.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=60)
+
+    @staticmethod
+    def _key(graph, params, isomorphic):
+        """Hash of the graph fingerprint and the solver parameters."""
+        key = json.dumps([graph_fingerprint(graph, isomorphic), params], sort_keys=True, default=str)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, graph, params, isomorphic=True):
+        """
+        Look up the result of a solver.
+
+        Args:
+            graph (nx.Graph): The solved graph.
+            params (dict): The solver parameters, JSON-serializable.
+            isomorphic (bool, optional): Whether to return results stored for isomorphic graphs. Defaults to True.
+
+        Returns:
+            dict: The result, with bitstrings relabeled to `graph`, or None on a cache miss.
+        """
+        graph = nx.convert_node_labels_to_integers(graph)
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT id, edges, result FROM results WHERE key = ?", (self._key(graph, params, isomorphic),)
+            ).fetchall()
+            for row_id, edges, result in rows:
+                stored_graph = nx.Graph()
+                stored_graph.add_nodes_from(range(len(graph)))
+                stored_graph.add_edges_from(json.loads(edges))
+                matcher = GraphMatcher(stored_graph, graph)
+                if isomorphic and not matcher.is_isomorphic():
+                    continue
+                mapping = matcher.mapping if isomorphic else {node: node for node in graph}
+
+                connection.execute("UPDATE results SET last_access = ? WHERE id = ?", (time.time(), row_id))
+                result = json.loads(result)
+                if "bitstrings" in result:
+                    result["bitstrings"] = {
+                        relabel_bitstring(bitstring, mapping): value for bitstring, value in result["bitstrings"].items()
+                    }
+                return result
+        return None
+
+    def put(self, graph, params, result, isomorphic=True):
+        """
+        Store the result of a solver, and evict the least recently used results if the cache is full.
+
+        Args:
+            graph (nx.Graph): The solved graph.
+            params (dict): The solver parameters, JSON-serializable.
+            result (dict): The result, JSON-serializable.
+            isomorphic (bool, optional): Whether the result is valid for isomorphic graphs. Defaults to True.
+        """
+        graph = nx.convert_node_labels_to_integers(graph)
+        result = json.dumps(result)
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO results (key, edges, result, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (self._key(graph, params, isomorphic), json.dumps(list(graph.edges)), result, len(result), time.time()),
+            )
+            connection.execute(
+                "DELETE FROM results WHERE id NOT IN (SELECT id FROM results ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            connection.execute(
+                "DELETE FROM results WHERE id IN (SELECT id FROM ("
+                "SELECT id, SUM(size) OVER (ORDER BY last_access DESC, id DESC) AS total FROM results"
+                ") WHERE total > ?)",
+                (self.max_size,),
+            )
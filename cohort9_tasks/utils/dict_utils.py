@@ -1,5 +1,3 @@
-import matplotlib.pyplot as plt
-
 class dotdict(dict):
     """dot.notation access to dictionary attributes"""
     __getattr__ = dict.get
@@ -8,6 +6,8 @@ class dotdict(dict):
 
 
 def plot_distribution(C):
+    import matplotlib.pyplot as plt
+
     C = dict(sorted(C.items(), key=lambda item: item[1], reverse=True))
     plt.figure(figsize=(12, 6))
     plt.xlabel("bitstrings")
@@ -1,4 +1,5 @@
 from .random_graph import get_random_graph
 from .star_graph import *
-from .nx2qubo import convert_to_qubo
-from .square_graph import get_square_graph
\ No newline at end of file
+from .nx2qubo import convert_to_qubo, convert_to_sparse_qubo, bitstrings_to_array, evaluate_qubo
+from .square_graph import get_square_graph
+from .mis_exact import mis_exact, approximation_ratio
@@ -1,5 +1,6 @@
 import numpy as np
 import networkx as nx
+from scipy import sparse
 
 
 def convert_to_qubo(graph):
@@ -29,6 +30,77 @@ def convert_to_qubo(graph):
     return qubo
 
 
+def convert_to_sparse_qubo(graph, penalty=20, reward=10, weight=None, format="csr"):
+    """
+    Convert an undirected graph to a sparse QUBO matrix, with one variable per node in graph order.
+
+    The matrix is `penalty * A - reward * I`, built in one call from the adjacency matrix A of the graph, so it
+    matches `convert_to_qubo` with the default weights without allocating the dense n x n matrix. The energy
+    `x^T Q x` of a bitstring is `2 * penalty` per edge with both nodes selected, minus `reward` per selected node.
+
+    Args:
+        graph (nx.Graph): The graph.
+        penalty (float, optional): Penalty of each of the two symmetric entries of an edge. Defaults to 20.
+        reward (float, optional): Reward of selecting a node, subtracted on the diagonal. Defaults to 10.
+        weight (str, optional): Edge attribute scaling the penalty of each edge, None for the same penalty on all
+            edges. Defaults to None.
+        format (str, optional): A `scipy.sparse` format, e.g. "csr" or "coo". Defaults to "csr".
+
+    Returns:
+        scipy.sparse.sparray: The QUBO matrix.
+    """
+    adjacency = nx.to_scipy_sparse_array(graph, weight=weight, format="csr")
+    diagonal = penalty * adjacency.diagonal() + reward  # self-loops are not penalized
+    qubo = penalty * adjacency - sparse.diags_array(diagonal, format="csr")
+    return qubo.asformat(format)
+
+
+def bitstrings_to_array(bitstrings):
+    """
+    Convert bitstrings to a (bitstrings, nodes) array of 0s and 1s.
+
+    Args:
+        bitstrings (list or array-like): Bitstrings such as "0110", or an array of 0s and 1s.
+
+    Returns:
+        numpy.ndarray: The bits, as uint8.
+    """
+    if len(bitstrings) and isinstance(bitstrings[0], str):
+        bits = np.frombuffer("".join(bitstrings).encode(), dtype=np.uint8) - ord("0")
+        return bits.reshape(len(bitstrings), -1)
+    return np.asarray(bitstrings, dtype=np.uint8)
+
+
+def evaluate_qubo(qubo, bitstrings, batch_bits=2**22):
+    """
+    Evaluate the QUBO energy and the independence violations of a batch of bitstrings at once.
+
+    Args:
+        qubo (array-like or scipy.sparse.sparray): A QUBO matrix from `convert_to_qubo` or `convert_to_sparse_qubo`.
+        bitstrings (list or array-like): Bitstrings over the nodes in graph order, see `bitstrings_to_array`.
+        batch_bits (int, optional): Number of bits multiplied by the QUBO matrix at a time, which bounds the
+            memory of the intermediate products. Defaults to 2^22.
+
+    Returns:
+        tuple: The energies `x^T Q x` and the numbers of edges (off-diagonal nonzeros) with both nodes selected,
+            two arrays with one value per bitstring.
+    """
+    qubo = sparse.csr_array(qubo)
+    edges = qubo - sparse.diags_array(qubo.diagonal(), format="csr")
+    edges.eliminate_zeros()
+    edges.data[:] = 1
+
+    bits = bitstrings_to_array(bitstrings)
+    batch_size = max(1, batch_bits // max(1, bits.shape[1]))
+    energies = np.empty(len(bits))
+    violations = np.empty(len(bits), dtype=np.int64)
+    for start in range(0, len(bits), batch_size):
+        x = bits[start : start + batch_size].astype(float)
+        energies[start : start + batch_size] = np.einsum("ij,ij->i", (qubo @ x.T).T, x)
+        violations[start : start + batch_size] = np.rint(np.einsum("ij,ij->i", (edges @ x.T).T, x) / 2)
+    return energies, violations
+
+
 if __name__ == "__main__":
     # Example usage:
 
@@ -1,5 +1,4 @@
 import networkx as nx
-import matplotlib.pyplot as plt
 
 
 def get_random_graph(num_nodes=8, p_edge=0.4, draw_graph=True, seed=12345):
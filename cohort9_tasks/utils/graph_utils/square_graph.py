@@ -1,44 +1,70 @@
 import math
 import numpy as np
-from scipy.spatial.distance import euclidean
+from scipy.spatial import cKDTree
 import networkx as nx
-import matplotlib.pyplot as plt
 
+LATTICES = ["square", "triangular"]
 
-def get_square_graph(num_nodes):
+
+def lattice_coords(num_sites, lattice="square"):
     """
-    Generate a square graph with the given number of nodes.
-    
+    Coordinates of the first sites of a lattice with unit spacing, filled row by row.
+
     Args:
-        num_nodes (int): The number of nodes in the graph.
-        
+        num_sites (int): The number of sites.
+        lattice (str, optional): One of ["square", "triangular"]. Defaults to "square".
+
     Returns:
-        G (NetworkX Graph): The generated square graph.
-        coords (list): A list of node coordinates.
+        numpy.ndarray: The coordinates, of shape (num_sites, 2).
+    """
+    if lattice not in LATTICES:
+        raise ValueError(f"Unknown lattice: {lattice} given, expected one of {LATTICES}.")
+
+    # Calculate the edge length of the grid
+    edge_length = math.ceil(np.sqrt(num_sites))
+    rows, cols = np.divmod(np.arange(num_sites), edge_length)
+    if lattice == "square":
+        return np.stack([rows, cols], axis=1)
+    # every other row is shifted by half a spacing, and rows are sqrt(3) / 2 apart
+    return np.stack([rows * np.sqrt(3) / 2, cols + (rows % 2) / 2], axis=1)
+
+
+def get_square_graph(num_nodes, radius=1.5, lattice="square", vacancy_fraction=0.0, seed=None):
     """
+    Generate a unit-disk graph of atoms on a lattice with the given number of nodes.
+
+    Nodes closer than `radius` are connected. The pairs are found with a KD-tree, so the generation takes
+    near-linear time, also for layouts of thousands of atoms.
 
-    # Calculate the edge length of the square grid
-    edge_length = math.ceil(np.sqrt(num_nodes))
+    Args:
+        num_nodes (int): The number of nodes in the graph.
+        radius (float, optional): The distance below which two nodes are connected, in lattice spacings. Defaults
+            to 1.5, which connects the diagonal neighbors of a square lattice.
+        lattice (str, optional): One of ["square", "triangular"]. Defaults to "square".
+        vacancy_fraction (float, optional): Fraction of the lattice sites left empty. The nodes occupy `num_nodes`
+            sites drawn at random among the first `num_nodes / (1 - vacancy_fraction)` sites. Defaults to 0.
+        seed (int, optional): Seed of the vacancies. Defaults to None.
+
+    Returns:
+        G (NetworkX Graph): The generated graph.
+        coords (numpy.ndarray): The node coordinates.
+    """
+    assert 0 <= vacancy_fraction < 1, f"The vacancy fraction must be in [0, 1), got {vacancy_fraction}."
 
-    # Generate coordinates for the nodes on the square grid
-    coords = coords = np.array(
-        [(r, c) for r in range(edge_length) for c in range(edge_length)]
-    )[:num_nodes]
+    num_sites = math.ceil(num_nodes / (1 - vacancy_fraction))
+    coords = lattice_coords(num_sites, lattice)
+    if num_sites > num_nodes:
+        sites = np.random.default_rng(seed).choice(num_sites, num_nodes, replace=False)
+        coords = coords[np.sort(sites)]
 
-    # Generate edges between nodes within a distance of 1.5 units
-    edges = []
-    coords_enum = list(enumerate(coords))
-    for i, vi in coords_enum:
-        for j, vj in coords_enum:
-            if j <= i:
-                continue
-            if euclidean(vi, vj) < 1.5:
-                edges.append((i, j))
+    # Generate edges between nodes closer than the radius (query_pairs also includes the radius itself)
+    pairs = cKDTree(coords).query_pairs(np.nextafter(radius, 0), output_type="ndarray")
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
 
     # Create a NetworkX graph
     G = nx.Graph()
     G.add_nodes_from(range(num_nodes))
-    G.add_edges_from(edges)
+    G.add_edges_from(pairs.tolist())
 
     return G, coords
 
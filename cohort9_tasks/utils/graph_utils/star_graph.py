@@ -1,10 +1,7 @@
 import networkx as nx
-import pyomo.core as pyo
-from pyomo.environ import SolverFactory
-import matplotlib.pyplot as plt
 
 
-def mis(graph: nx.Graph) -> pyo.ConcreteModel:
+def mis(graph: nx.Graph) -> "pyo.ConcreteModel":
     """
     Define a maximum independent set (MIS) problem using Pyomo for a given graph.
 
@@ -14,6 +11,8 @@ def mis(graph: nx.Graph) -> pyo.ConcreteModel:
     Returns:
     pyo.ConcreteModel: A Pyomo model representing the MIS problem.
     """
+    import pyomo.core as pyo
+
     problem = pyo.ConcreteModel("mis")
     problem.x = pyo.Var(graph.nodes, domain=pyo.Binary)
 
@@ -36,6 +35,8 @@ def get_mis_problem(draw_graph=True):
     graph = nx.star_graph(4)
 
     if draw_graph:
+        import matplotlib.pyplot as plt
+
         nx.draw(graph)
         plt.show()
 
@@ -44,12 +45,10 @@ def get_mis_problem(draw_graph=True):
 
 
 if __name__ == "__main__":
-    graph, mis_problem = get_mis_problem(draw_graph=False)
+    from mis_exact import mis_exact
 
-    # Solve the MIS problem
-    solver = SolverFactory("glpk")
-    solver.solve(mis_problem)
+    graph, mis_problem = get_mis_problem(draw_graph=False)
 
-    # Extract the solution
-    solution = [node for node in graph.nodes if pyo.value(mis_problem.x[node]) > 0]
+    # Solve the MIS problem in-process, without building the Pyomo model for GLPK
+    solution = mis_exact(graph)
     print("Maximum Independent Set:", solution)
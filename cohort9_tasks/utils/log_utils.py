@@ -0,0 +1,119 @@
+import csv
+import json
+import os
+import sys
+import numpy as np
+
+
+class OptimizationLogger:
+    """
+    A buffered, append-only logger for optimization runs.
+
+    Rows are kept in memory and appended to the file every `flush_every` rows, so each row is written
+    exactly once. Two formats are supported, chosen from the file extension:
+
+    - ".bin": a compact binary format, a JSON header line with the column names followed by float64 records.
+    - anything else: CSV with a header row.
+
+    Use `read_logs` to load either format back into a pandas DataFrame.
+    """
+
+    def __init__(self, logs_file, columns, flush_every=100, append=False):
+        """
+        Initialize the logger and write the header, truncating any existing file.
+
+        Args:
+            logs_file (str): Path to the logs file.
+            columns (list): Column names. Every logged row must have one numeric value per column.
+            flush_every (int, optional): Number of rows buffered before appending them to the file. Defaults to 100.
+            append (bool, optional): Whether to append to an existing file with the same columns instead, e.g. when
+                resuming an optimization. The header is only written if the file is new. Defaults to False.
+        """
+        self.logs_file = logs_file
+        self.columns = [str(column) for column in columns]
+        self.flush_every = max(1, flush_every)
+        self.binary = logs_file.endswith(".bin")
+        self.rows = []
+
+        write_header = not (append and os.path.exists(logs_file) and os.path.getsize(logs_file) > 0)
+        mode = "a" if append else "w"
+        if self.binary:
+            self.file = open(logs_file, mode + "b")
+            if write_header:
+                self.file.write(json.dumps(self.columns).encode() + b"\n")
+        else:
+            self.file = open(logs_file, mode, newline="")
+            self.writer = csv.writer(self.file)
+            if write_header:
+                self.writer.writerow(self.columns)
+
+    def log(self, row):
+        """Buffer a row, flushing the buffer to the file once it is full."""
+        self.rows.append(row)
+        if len(self.rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered rows to the file."""
+        if not self.rows:
+            return
+        if self.binary:
+            self.file.write(np.asarray(self.rows, dtype="<f8").tobytes())
+        else:
+            self.writer.writerows(self.rows)
+        self.file.flush()
+        self.rows = []
+
+    def close(self):
+        """Flush the remaining rows and close the file."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_logs(logs_file):
+    """
+    Read a logs file written by `OptimizationLogger` into a DataFrame.
+
+    Args:
+        logs_file (str): Path to a ".bin" or CSV logs file.
+
+    Returns:
+        pandas.DataFrame: The logged rows. A "Timestamp" column of unix times is converted to datetimes.
+    """
+    import pandas as pd
+
+    if logs_file.endswith(".bin"):
+        with open(logs_file, "rb") as f:
+            columns = json.loads(f.readline())
+            data = np.frombuffer(f.read(), dtype="<f8").reshape(-1, len(columns))
+        df = pd.DataFrame(data, columns=columns)
+    else:
+        df = pd.read_csv(logs_file)
+
+    if "Timestamp" in df:
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="s")
+    return df
+
+
+def peak_memory_mb():
+    """
+    Peak resident memory of this process so far, in MB.
+
+    Returns:
+        float: The peak memory, or None on platforms without the `resource` module (e.g. Windows).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024